@@ -2,6 +2,7 @@
 
 import argparse
 
+import coinproblem.batch as batch
 import coinproblem.solver as solver
 
 
@@ -13,25 +14,129 @@ def get_cli_args():
 
     parser.add_argument("--total-coin-amount", "-a", type=float)
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--engine", "-e", choices=solver.ENGINES, default=solver.DEFAULT_ENGINE
+    )
+
+    parser.add_argument(
+        "--denominations",
+        "-d",
+        type=solver.parse_denominations,
+        help="the coins to solve for, as either the name of a set ("
+        + ", ".join(solver.DENOMINATION_SETS)
+        + ") or a list of type=cents pairs (default: us)",
+    )
+
+    parser.add_argument(
+        "--objective",
+        help="find the solution with the fewest or most of a coin type "
+        "(e.g. min:pennies or max:quarters)",
+    )
+
+    parser.add_argument(
+        "--batch",
+        "-b",
+        type=argparse.FileType("r"),
+        help="solve every count,amount row in the given file (or - for stdin)",
+    )
+
+    parser.add_argument(
+        "--sweep-to",
+        type=float,
+        metavar="AMOUNT",
+        help="solve every amount from the coin amount to this amount, a cent "
+        "apart, for the same coin count",
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=argparse.FileType("w", bufsize=1 << 16),
+        default="-",
+        help="the file to write batch or sweep results to (default: stdout)",
+    )
+
+    parser.add_argument(
+        "--format", choices=batch.BATCH_FORMATS, default=batch.BATCH_FORMATS[0]
+    )
+
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="the number of worker processes to solve batches with",
+    )
 
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        help="the number of rows to hand to each worker at a time",
+    )
 
-def main(total_coin_count, total_coin_amount):
+    parser.add_argument(
+        "--table",
+        help="answer queries from a table built with `python -m coinproblem.table`",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print the path, work and time per phase taken to solve the problem",
+    )
+
+    params = parser.parse_args()
+    if params.stats and (params.batch or params.sweep_to is not None):
+        parser.error("--stats cannot be used with --batch or --sweep-to")
+    if params.sweep_to is not None and (
+        params.total_coin_count is None or params.total_coin_amount is None
+    ):
+        parser.error("--sweep-to requires --total-coin-count and --total-coin-amount")
+    if params.objective and (params.batch or params.sweep_to is not None):
+        parser.error("--objective cannot be used with --batch or --sweep-to")
+    if params.denominations and (params.batch or params.sweep_to is not None):
+        parser.error("--denominations cannot be used with --batch or --sweep-to")
+    if params.objective:
+        if params.denominations and params.denominations != solver.COIN_CENTS:
+            parser.error("--objective can only be used with US coins")
+        # Objectives are solved directly on the solution lattice, so neither
+        # another engine nor the solver stats apply to them
+        if params.engine != solver.DEFAULT_ENGINE:
+            parser.error("--objective cannot be used with --engine")
+        if params.stats:
+            parser.error("--objective cannot be used with --stats")
+        try:
+            solver.parse_objective(params.objective)
+        except ValueError as error:
+            parser.error(str(error))
+    return params
+
+
+def print_coin_counts(
+    total_coin_count,
+    total_coin_amount,
+    engine=solver.DEFAULT_ENGINE,
+    denominations=None,
+    objective=None,
+):
     print("Total Coin Count:".ljust(18), f"{total_coin_count:,}")
     print("Total Coin Amount:".ljust(18), f"${total_coin_amount:.2f}")
     print()
 
-    coin_counts = solver.get_coin_counts(total_coin_count, total_coin_amount)
+    coin_counts = solver.get_coin_counts(
+        total_coin_count, total_coin_amount, engine, denominations, objective
+    )
     if not coin_counts:
         print("No solution")
         return
 
     current_coin_count = solver.get_current_count(coin_counts)
-    current_coin_amount = solver.get_current_amount(coin_counts)
+    current_coin_amount = solver.get_current_amount(coin_counts, denominations)
 
+    name_width = max(9, *(len(name) + 2 for name in coin_counts))
     print(
         "\n".join(
-            f"{name.capitalize() + ':':<9}{count:,}"
+            f"{name.capitalize() + ':':<{name_width}}{count:,}"
             for name, count in coin_counts.items()
         )
     )
@@ -41,5 +146,56 @@ def main(total_coin_count, total_coin_amount):
     print("Solved Coin Amount:".ljust(18), f"${current_coin_amount:.2f}")
 
 
+# Print the solver's instrumentation counters, one per line
+def print_solver_stats(stats):
+    print()
+    print("Solver Stats:")
+    for path, count in stats["paths"].items():
+        print(f"  path {path}: {count:,}")
+    for name, count in stats["counters"].items():
+        print(f"  {name}: {count:,}")
+    for phase, elapsed in stats["phase_ns"].items():
+        print(f"  {phase} time: {elapsed / 1e3:,.1f} µs")
+    for engine, elapsed in stats["engine_ns"].items():
+        print(f"  {engine} engine time: {elapsed / 1e3:,.1f} µs")
+
+
+def main():
+    params = get_cli_args()
+    if params.table:
+        solver.load_table(params.table)
+    if params.stats:
+        solver.enable_stats()
+    if params.batch:
+        batch.run_batch(
+            input_file=params.batch,
+            output_file=params.output,
+            batch_format=params.format,
+            engine=params.engine,
+            workers=params.workers,
+            chunk_size=params.chunk_size,
+            table_path=params.table,
+        )
+    elif params.sweep_to is not None:
+        batch.run_sweep(
+            output_file=params.output,
+            total_coin_count=params.total_coin_count,
+            start_amount=params.total_coin_amount,
+            stop_amount=params.sweep_to,
+            batch_format=params.format,
+            engine=params.engine,
+        )
+    else:
+        print_coin_counts(
+            params.total_coin_count,
+            params.total_coin_amount,
+            params.engine,
+            params.denominations,
+            params.objective,
+        )
+        if params.stats:
+            print_solver_stats(solver.get_stats())
+
+
 if __name__ == "__main__":
-    main(**vars(get_cli_args()))
+    main()
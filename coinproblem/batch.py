@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+import collections
+import concurrent.futures
+import csv
+import functools
+import itertools
+import json
+import math
+import os
+import sys
+
+import coinproblem.solver as solver
+
+# NumPy is an optional dependency (install the `numpy` extra to enable it); the
+# pure-Python fallback below produces the same results, only more slowly
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+# Reduce every (count, cents) pair to its solution lattice with NumPy, using
+# the same arithmetic as solver.get_solution_lattice, but over whole arrays at
+# once; return the lattice arrays along with a mask of the solvable pairs
+def get_lattices_with_numpy(counts, cents):
+    remainder = cents - counts
+    base_dimes = remainder % 4
+    base_sum = (remainder - 9 * base_dimes) // 4
+    min_quarters = -((counts - base_sum - base_dimes) // 5)
+    max_step = numpy.minimum(base_sum // 9, (base_sum - 6 * min_quarters) // 3)
+    solvable = (counts >= 0) & (remainder >= 0) & (base_sum >= 0) & (max_step >= 0)
+    return base_dimes, base_sum, min_quarters, solvable
+
+
+# Solve every (count, amount) pair with NumPy, using the same lattice
+# arithmetic as solver.solve_with_lattice, but over whole arrays at once
+def solve_batch_with_numpy(counts, amounts):
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+    cents = numpy.rint(numpy.asarray(amounts, dtype=numpy.float64) * 100).astype(
+        numpy.int64
+    )
+    base_dimes, base_sum, min_quarters, solvable = get_lattices_with_numpy(
+        counts, cents
+    )
+
+    quarters = numpy.maximum(min_quarters, 0)
+    nickels = base_sum - 6 * quarters
+    coin_counts = numpy.stack(
+        (counts - nickels - base_dimes - quarters, nickels, base_dimes, quarters),
+        axis=-1,
+    )
+    coin_counts[~solvable] = 0
+    return coin_counts, solvable
+
+
+# Solve every (count, amount) pair one at a time, for when NumPy is unavailable
+def solve_batch_with_python(counts, amounts):
+    coin_counts = []
+    solvable = []
+    for count, amount in zip(counts, amounts):
+        lattice = solver.get_solution_lattice(count, solver.get_amount_cents(amount))
+        if lattice is None:
+            coin_counts.append((0, 0, 0, 0))
+            solvable.append(False)
+            continue
+        point = solver.get_lattice_point(lattice, 0, max(0, lattice.min_quarters))
+        coin_counts.append(tuple(point))
+        solvable.append(True)
+    return coin_counts, solvable
+
+
+# Solve many (count, amount) pairs at once; return an (N, 4) array of coin
+# counts (ordered as in solver.COIN_TYPES) along with a mask that is False for
+# every unsolvable row (whose coin counts are all zero); without NumPy, these
+# are returned as a list of tuples and a list of booleans instead
+def solve_batch(counts, amounts):
+    if numpy is not None:
+        return solve_batch_with_numpy(counts, amounts)
+    return solve_batch_with_python(counts, amounts)
+
+
+# Return a map of which amounts (in cents) can be made with exactly the given
+# number of coins, for every amount in the given range of cents (by default,
+# every amount from zero up to the value of that many quarters); the map is a
+# NumPy boolean array, or (without NumPy) a bytearray of zeroes and ones
+def feasibility_map(total_coin_count, cents_range=None):
+    if cents_range is None:
+        cents_range = range(25 * total_coin_count + 1)
+    if numpy is not None:
+        cents = numpy.arange(
+            cents_range.start, cents_range.stop, cents_range.step, dtype=numpy.int64
+        )
+        return get_lattices_with_numpy(numpy.int64(total_coin_count), cents)[-1]
+    return bytearray(
+        solver.get_solution_lattice(total_coin_count, cents) is not None
+        for cents in cents_range
+    )
+
+
+# The formats supported for reading and writing batches of problems
+BATCH_FORMATS = ("csv", "jsonl")
+
+
+# Parse the count and amount of a row, raising a ValueError if either is not a
+# number (or if the amount is infinite or NaN)
+def parse_row(count, amount):
+    count, amount = int(count), float(amount)
+    if not math.isfinite(amount):
+        raise ValueError(f"amount is not finite: {amount}")
+    return count, amount
+
+
+# Lazily read (count, amount) rows from a file of comma-separated values (in
+# the same count,amount form as the player protocol) or of JSON objects with
+# "count" and "amount" keys; blank lines and a CSV header line are skipped, and
+# any other malformed row is reported and read as (None, None), so that it is
+# written out as unsolvable rather than ending the whole batch
+def read_rows(input_file, input_format):
+    if input_format == "jsonl":
+        for line_number, line in enumerate(input_file, 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                    parsed_row = parse_row(row["count"], row["amount"])
+                except (ValueError, TypeError, KeyError) as error:
+                    print(
+                        f"malformed row on line {line_number}: {error}", file=sys.stderr
+                    )
+                    parsed_row = (None, None)
+                yield parsed_row
+    else:
+        for line_number, row in enumerate(csv.reader(input_file), 1):
+            if row:
+                try:
+                    if len(row) < 2:
+                        raise ValueError("expected a count and an amount")
+                    parsed_row = parse_row(row[0], row[1])
+                except ValueError as error:
+                    if line_number == 1:
+                        continue
+                    print(
+                        f"malformed row on line {line_number}: {error}", file=sys.stderr
+                    )
+                    parsed_row = (None, None)
+                yield parsed_row
+
+
+# Format a solved row for output in the given format; unsolvable rows have
+# empty coin counts (for CSV) or null coin counts (for JSON)
+def format_row(count, amount, coin_counts, output_format):
+    if output_format == "jsonl":
+        return (
+            json.dumps(
+                {"count": count, "amount": amount, "coin_counts": coin_counts},
+                separators=(",", ":"),
+            )
+            + "\n"
+        )
+    if count is None:
+        return ",,,,,\n"
+    if coin_counts is None:
+        return f"{count},{amount},,,,\n"
+    fields = [count, amount, *(coin_counts[t] for t in solver.COIN_TYPES)]
+    return ",".join(map(str, fields)) + "\n"
+
+
+# Solve a chunk of rows and return the formatted output for the whole chunk,
+# so that only one string needs to travel back from each worker
+def solve_chunk(rows, output_format, engine):
+    return "".join(
+        format_row(
+            count,
+            amount,
+            solver.get_coin_counts(count, amount, engine)
+            if count is not None
+            else None,
+            output_format,
+        )
+        for count, amount in rows
+    )
+
+
+# Solve every row from the input file across a pool of worker processes and
+# write the results to the output file, in input order; at most a couple of
+# chunks per worker are in flight at any one time, so memory use stays flat no
+# matter how large the input is
+def run_batch(
+    input_file,
+    output_file,
+    batch_format=BATCH_FORMATS[0],
+    engine=solver.DEFAULT_ENGINE,
+    workers=None,
+    chunk_size=10_000,
+    table_path=None,
+):
+    workers = workers or os.cpu_count()
+    rows = read_rows(input_file, batch_format)
+    chunks = iter(lambda: list(itertools.islice(rows, chunk_size)), [])
+    solve = functools.partial(solve_chunk, output_format=batch_format, engine=engine)
+    # Each worker maps the answer table for itself
+    initializer = solver.load_table if table_path else None
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=initializer, initargs=(table_path,)
+    ) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(solve, chunk))
+            if len(pending) >= workers * 2:
+                output_file.write(pending.popleft().result())
+        while pending:
+            output_file.write(pending.popleft().result())
+    output_file.flush()
+
+
+# Write the solution for every amount (a cent apart) from the start amount to
+# the stop amount (inclusive) of the given number of coins, re-solving each
+# amount from the solution to the one before it; rows are written as they are
+# solved, so a sweep of any length streams in constant memory
+def run_sweep(
+    output_file,
+    total_coin_count,
+    start_amount,
+    stop_amount,
+    batch_format=BATCH_FORMATS[0],
+    engine=solver.DEFAULT_ENGINE,
+):
+    start_cents = solver.get_amount_cents(start_amount)
+    stop_cents = solver.get_amount_cents(stop_amount)
+    step = 1 if stop_cents >= start_cents else -1
+    amounts = (cents / 100 for cents in range(start_cents, stop_cents + step, step))
+    for amount, coin_counts in solver.sweep_coin_counts(
+        total_coin_count, amounts, engine
+    ):
+        output_file.write(
+            format_row(total_coin_count, amount, coin_counts, batch_format)
+        )
+    output_file.flush()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import coinproblem.solver as solver
+
+# The total coin count of every input in each size tier (or, for the small
+# tier, the largest total coin count)
+TIERS = {"small": 20, "1k": 1_000, "10k": 10_000, "65535": 65_535}
+
+# The engines benchmarked unless others are given; the exhaustive engine is
+# left out, since it takes up to a tenth of a second per input at 65,535 coins
+DEFAULT_ENGINES = [engine for engine in solver.ENGINES if engine != "exhaustive"]
+
+# The handpicked [pennies, nickels, dimes, quarters] cases from the test suite
+CASES_PATH = Path(__file__).parent.parent / "tests" / "test_cases.json"
+
+
+# Read and parse arguments to the benchmark program
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--engine",
+        "-e",
+        action="append",
+        choices=solver.ENGINES,
+        help="the engine(s) to benchmark (default: all but exhaustive)",
+    )
+    parser.add_argument(
+        "--inputs",
+        type=int,
+        default=100,
+        help="the number of inputs to time for each size tier",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="the number of times to time each input (the fastest time is kept)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="the seed for generating the inputs for each size tier",
+    )
+    parser.add_argument(
+        "--cases",
+        default=CASES_PATH,
+        help="the JSON file of handpicked coin counts to time",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="write the results to this JSON file (e.g. to save a baseline)",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="compare the results against those saved in this JSON file",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="the slowdown (as a fraction of the baseline) that is a regression",
+    )
+
+    return parser.parse_args()
+
+
+# Return the (count, amount) input for the given coin counts
+def get_input(counts_list):
+    return (
+        sum(counts_list),
+        sum(map(int.__mul__, counts_list, solver.CENT_VALUES)) / 100,
+    )
+
+
+# Generate solvable inputs with the given total coin count (or, if small, with
+# any total coin count up to it), by splitting the count between the coin
+# types at random
+def get_tier_inputs(tier, input_count, rng):
+    inputs = []
+    for _ in range(input_count):
+        count = rng.randint(0, TIERS[tier]) if tier == "small" else TIERS[tier]
+        cuts = sorted(rng.randint(0, count) for _ in range(3))
+        counts_list = [b - a for a, b in zip([0, *cuts], [*cuts, count])]
+        inputs.append(get_input(counts_list))
+    return inputs
+
+
+# Return the inputs for the handpicked test cases
+def get_case_inputs(cases_path):
+    with open(cases_path) as cases_file:
+        return [get_input(counts_list) for counts_list in json.load(cases_file)]
+
+
+# Time get_coin_counts() for each input with the given engine, and return the
+# fastest of the repeated times for each input (in nanoseconds)
+def time_inputs(inputs, engine, repeat):
+    times = []
+    for count, amount in inputs:
+        best_time = None
+        for _ in range(repeat):
+            start_time = time.perf_counter_ns()
+            solver.get_coin_counts(count, amount, engine)
+            elapsed = time.perf_counter_ns() - start_time
+            if best_time is None or elapsed < best_time:
+                best_time = elapsed
+        times.append(best_time)
+    return times
+
+
+# Time every engine across every size tier (and the handpicked cases, if the
+# file is present), and return the results keyed by engine and tier
+def run_benchmarks(engines, input_count=100, repeat=5, seed=0, cases_path=None):
+    rng = random.Random(seed)
+    tier_inputs = {tier: get_tier_inputs(tier, input_count, rng) for tier in TIERS}
+    if cases_path and Path(cases_path).exists():
+        tier_inputs["cases"] = get_case_inputs(cases_path)
+    results = {}
+    for engine in engines:
+        for tier, inputs in tier_inputs.items():
+            times = time_inputs(inputs, engine, repeat)
+            results[f"{engine}/{tier}"] = {
+                "inputs": len(times),
+                "median_ns": statistics.median(times),
+                "mean_ns": statistics.mean(times),
+                "max_ns": max(times),
+            }
+    return results
+
+
+# The timings compared against the baseline; the mean is compared as well as
+# the median, so that a few inputs falling off the fast path (which barely
+# moves the median) are still caught
+COMPARED_TIMES = ("median_ns", "mean_ns")
+
+
+# Return the names of the benchmarks whose median or mean time has grown by
+# more than the given fraction of their baseline time
+def get_regressions(results, baseline, threshold):
+    return [
+        name
+        for name, result in results.items()
+        if name in baseline
+        and any(
+            result[key] > baseline[name][key] * (1 + threshold)
+            for key in COMPARED_TIMES
+        )
+    ]
+
+
+# Print a table of the results, compared against the baseline (if any)
+def print_results(results, baseline=None, regressions=()):
+    print(f"{'benchmark':<24}{'median':>14}{'mean':>14}{'max':>14}{'mean change':>14}")
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline:
+            ratio = result["mean_ns"] / baseline[name]["mean_ns"] - 1
+            change = f"{ratio * 100:+.1f} %"
+        print(
+            f"{name:<24}"
+            f"{result['median_ns'] / 1e3:>11,.1f} µs"
+            f"{result['mean_ns'] / 1e3:>11,.1f} µs"
+            f"{result['max_ns'] / 1e3:>11,.1f} µs"
+            f"{change:>14}"
+            f"{'  REGRESSED' if name in regressions else ''}"
+        )
+
+
+def main():
+    params = get_cli_args()
+    results = run_benchmarks(
+        params.engine or DEFAULT_ENGINES,
+        params.inputs,
+        params.repeat,
+        params.seed,
+        params.cases,
+    )
+    baseline = None
+    regressions = []
+    if params.baseline:
+        with open(params.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = get_regressions(results, baseline, params.threshold)
+    print_results(results, baseline, regressions)
+    if params.output:
+        with open(params.output, "w") as output_file:
+            json.dump(
+                {"python": platform.python_version(), "results": results},
+                output_file,
+                indent=2,
+            )
+    if regressions:
+        print()
+        print(
+            f"{len(regressions):,} benchmark(s) slowed down by more than "
+            f"{params.threshold * 100:.0f} %: {', '.join(regressions)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
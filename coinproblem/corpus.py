@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+import argparse
+import array
+import mmap
+import os
+import random
+import struct
+import sys
+
+# The largest count per coin type whose totals still fit in a corpus entry
+MAX_COUNT = 0xFFFFFFFF // 100
+
+
+class CorpusError(Exception):
+    pass
+
+
+class InputCorpus(object):
+    """A pregenerated, memory-mapped sequence of (count, cents) inputs for the
+    referee; the same corpus always yields the same inputs in the same order,
+    and reading an input costs a single unpack from the mapped file."""
+
+    MAGIC = b"COINCRP\0"
+    VERSION = 1
+    # The magic bytes, format version, seed, min and max count per coin type,
+    # and number of inputs
+    HEADER = struct.Struct("<8sHQIIQ")
+    # The total coin count and total cents of an input
+    ENTRY = struct.Struct("<2I")
+
+    def __init__(self, path):
+        with open(path, "rb") as corpus_file:
+            self.map = mmap.mmap(corpus_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.validate()
+        except CorpusError:
+            self.close()
+            raise
+
+    # Raise a CorpusError if the corpus was written in a different format, or
+    # if it is missing inputs
+    def validate(self):
+        if len(self.map) < self.HEADER.size:
+            raise CorpusError("input corpus is truncated")
+        magic, version, seed, min_count, max_count, size = self.HEADER.unpack_from(
+            self.map
+        )
+        if magic != self.MAGIC:
+            raise CorpusError("file is not an input corpus")
+        if version != self.VERSION:
+            raise CorpusError(
+                f"input corpus has format version {version}, "
+                f"expected {self.VERSION}; please regenerate it"
+            )
+        if size == 0 or len(self.map) != self.HEADER.size + size * self.ENTRY.size:
+            raise CorpusError("input corpus is truncated")
+        self.seed = seed
+        self.min_count = min_count
+        self.max_count = max_count
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    # Return the input at the given index, in the same form as the referee's
+    # generated inputs; indices past the end of the corpus wrap around to the
+    # start, so a corpus of any size can feed a run of any length
+    def get_input(self, index):
+        count, cents = self.ENTRY.unpack_from(
+            self.map, self.HEADER.size + self.ENTRY.size * (index % self.size)
+        )
+        return {"count": count, "amount": cents / 100}
+
+    def close(self):
+        self.map.close()
+
+
+# Generate every input for a corpus in bulk, a chunk at a time; each input is
+# drawn the same way as the referee's own inputs (a random number of each coin
+# type), but from a generator seeded with the given seed
+def generate_entries(size, min_count, max_count, seed, chunk_size=1 << 16):
+    rng = random.Random(seed)
+    coin_range = range(min_count, max_count + 1)
+    for start in range(0, size, chunk_size):
+        chunk_length = min(chunk_size, size - start)
+        coins = rng.choices(coin_range, k=4 * chunk_length)
+        coin_counts = list(zip(coins[0::4], coins[1::4], coins[2::4], coins[3::4]))
+        entries = array.array("I", bytes(InputCorpus.ENTRY.size * chunk_length))
+        entries[0::2] = array.array("I", map(sum, coin_counts))
+        entries[1::2] = array.array(
+            "I",
+            [
+                pennies + 5 * nickels + 10 * dimes + 25 * quarters
+                for pennies, nickels, dimes, quarters in coin_counts
+            ],
+        )
+        if sys.byteorder == "big":
+            entries.byteswap()
+        yield entries.tobytes()
+
+
+# Write a corpus of the given number of inputs to the given path; the corpus is
+# written to a temporary file first, so that a half-written corpus never
+# replaces a good one
+def generate_corpus(path, size, min_count, max_count, seed):
+    if size < 1:
+        raise ValueError("corpus size must be at least 1")
+    if not 0 <= min_count <= max_count <= MAX_COUNT:
+        raise ValueError(f"min and max count must be between 0 and {MAX_COUNT:,}")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as corpus_file:
+        corpus_file.write(
+            InputCorpus.HEADER.pack(
+                InputCorpus.MAGIC,
+                InputCorpus.VERSION,
+                seed,
+                min_count,
+                max_count,
+                size,
+            )
+        )
+        corpus_file.writelines(generate_entries(size, min_count, max_count, seed))
+    os.replace(temp_path, path)
+
+
+# Read and parse arguments to the corpus generator
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("path", help="the input corpus file to write")
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=1_000_000,
+        help="the number of inputs to generate",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="the seed for generating inputs (random if omitted)",
+    )
+    parser.add_argument(
+        "--min-count",
+        "--min",
+        metavar="--min",
+        type=int,
+        default=0,
+        help="the minimum number of coins per coin type to be generated",
+    )
+    parser.add_argument(
+        "--max-count",
+        "--max",
+        metavar="--max",
+        type=int,
+        default=100,
+        help="the maximum number of coins per coin type to be generated",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    params = get_cli_args()
+    seed = params.seed if params.seed is not None else random.getrandbits(32)
+    generate_corpus(params.path, params.size, params.min_count, params.max_count, seed)
+    corpus = InputCorpus(params.path)
+    print(f"wrote {len(corpus):,} inputs (seed {corpus.seed}) to {params.path}")
+
+
+if __name__ == "__main__":
+    main()
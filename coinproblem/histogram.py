@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import array
+import math
+
+
+class LatencyHistogram(object):
+    """A fixed-size histogram of latencies (in nanoseconds) with logarithmic
+    buckets, in the style of an HDR histogram: values below 2^SIGNIFICANT_BITS
+    are counted exactly, and larger values are counted in buckets that are
+    never more than 1 / 2^(SIGNIFICANT_BITS - 1) of their value wide."""
+
+    SIGNIFICANT_BITS = 6
+    # The number of buckets for each power of two above the exact range
+    HALF_RANGE = 1 << (SIGNIFICANT_BITS - 1)
+    EXACT_RANGE = 1 << SIGNIFICANT_BITS
+    BUCKET_COUNT = EXACT_RANGE + (64 - SIGNIFICANT_BITS) * HALF_RANGE
+
+    def __init__(self):
+        self.counts = array.array("Q", [0]) * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def get_bucket_index(cls, value):
+        if value < cls.EXACT_RANGE:
+            return value
+        exponent = value.bit_length() - cls.SIGNIFICANT_BITS
+        mantissa = value >> exponent
+        # The mantissa is always at least HALF_RANGE
+        return cls.EXACT_RANGE + (exponent - 2) * cls.HALF_RANGE + mantissa
+
+    # Return the value in the middle of the bucket at the given index
+    @classmethod
+    def get_bucket_value(cls, index):
+        if index < cls.EXACT_RANGE:
+            return index
+        exponent, offset = divmod(index - cls.EXACT_RANGE, cls.HALF_RANGE)
+        exponent += 1
+        lowest_value = (offset + cls.HALF_RANGE) << exponent
+        return lowest_value + (1 << exponent) // 2
+
+    # Record a single value; this is called once per round, so the bucket
+    # index is computed inline rather than through get_bucket_index()
+    def record(self, value):
+        if value < self.EXACT_RANGE:
+            self.counts[value] += 1
+        else:
+            exponent = value.bit_length() - self.SIGNIFICANT_BITS
+            self.counts[
+                self.EXACT_RANGE
+                + (exponent - 2) * self.HALF_RANGE
+                + (value >> exponent)
+            ] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    # Add every value recorded by another histogram to this one
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    # Return the value that the given percentage of recorded values are no
+    # greater than (to within the precision of the buckets)
+    def get_percentile(self, percentile):
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.get_bucket_value(index), self.max)
+        return self.max
+
+    def get_mean(self):
+        return self.total / self.count if self.count else 0
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import math
+import statistics
+
+# The two-sided 95% critical values of Student's t-distribution for 1 to 30
+# degrees of freedom
+T_CRITICAL_VALUES = (
+    12.706,
+    4.303,
+    3.182,
+    2.776,
+    2.571,
+    2.447,
+    2.365,
+    2.306,
+    2.262,
+    2.228,
+    2.201,
+    2.179,
+    2.160,
+    2.145,
+    2.131,
+    2.120,
+    2.110,
+    2.101,
+    2.093,
+    2.086,
+    2.080,
+    2.074,
+    2.069,
+    2.064,
+    2.060,
+    2.056,
+    2.052,
+    2.048,
+    2.045,
+    2.042,
+)
+
+# The same critical values for larger numbers of degrees of freedom, largest
+# first
+T_CRITICAL_TAIL = ((120, 1.980), (60, 2.000), (40, 2.021))
+
+
+# Return the two-sided 95% critical value of the t-distribution for the given
+# degrees of freedom; fractional degrees of freedom are rounded down, and any
+# number between two tabulated ones takes the value of the smaller one, which
+# errs on the side of a wider interval
+def get_t_critical(degrees_of_freedom):
+    degrees_of_freedom = max(1, math.floor(degrees_of_freedom))
+    if degrees_of_freedom <= len(T_CRITICAL_VALUES):
+        return T_CRITICAL_VALUES[degrees_of_freedom - 1]
+    for tail_degrees_of_freedom, critical_value in T_CRITICAL_TAIL:
+        if degrees_of_freedom >= tail_degrees_of_freedom:
+            return critical_value
+    return T_CRITICAL_VALUES[-1]
+
+
+# Return the number of correct answers per second in each of the player's
+# trials; incorrect answers are left out, so that a player can't climb the
+# leaderboard by answering quickly but wrongly
+def get_trial_throughputs(player):
+    return [
+        trial["correct"] / trial["elapsed"] if trial["elapsed"] else 0
+        for trial in player.trials
+    ]
+
+
+# Return the mean of the given samples, and the half-width of its 95%
+# confidence interval (which is infinite for a single sample)
+def get_confidence_interval(samples):
+    mean = statistics.mean(samples)
+    if len(samples) < 2:
+        return mean, math.inf
+    half_width = (
+        get_t_critical(len(samples) - 1)
+        * statistics.stdev(samples)
+        / math.sqrt(len(samples))
+    )
+    return mean, half_width
+
+
+# Return whether the mean of the given samples is greater than that of the
+# other samples with 95% confidence, according to Welch's t-test (which does
+# not assume that both samples have the same variance)
+def is_significantly_greater(samples, other_samples):
+    if len(samples) < 2 or len(other_samples) < 2:
+        return False
+    difference = statistics.mean(samples) - statistics.mean(other_samples)
+    if difference <= 0:
+        return False
+    variance = statistics.variance(samples) / len(samples)
+    other_variance = statistics.variance(other_samples) / len(other_samples)
+    if not variance and not other_variance:
+        return True
+    # The Welch-Satterthwaite approximation of the degrees of freedom
+    degrees_of_freedom = (variance + other_variance) ** 2 / (
+        variance**2 / (len(samples) - 1) + other_variance**2 / (len(other_samples) - 1)
+    )
+    return difference / math.sqrt(variance + other_variance) > get_t_critical(
+        degrees_of_freedom
+    )
+
+
+# Rank the players by their correct answers per second across their trials,
+# and return them in order of rank; a player's rank is one more than the
+# number of players that are significantly faster than it, so players whose
+# difference could just be noise share a rank
+def rank_players(players):
+    for player in players:
+        player.throughputs = get_trial_throughputs(player)
+        player.throughput, player.throughput_interval = get_confidence_interval(
+            player.throughputs
+        )
+    for player in players:
+        player.rank = 1 + sum(
+            is_significantly_greater(other.throughputs, player.throughputs)
+            for other in players
+            if other is not player
+        )
+    return sorted(players, key=lambda player: (player.rank, -player.throughput))
+
+
+# Print the ranked players (see rank_players) as a table
+def print_leaderboard(ranked_players):
+    print(
+        f"{'rank':<6}{'player':<8}{'trials':>8}"
+        f"{'correct/s (95% CI)':>28}{'success':>10}"
+    )
+    for player in ranked_players:
+        throughput = f"{player.throughput:,.1f} ± {player.throughput_interval:,.1f}"
+        print(
+            f"{player.rank:<6}{'P' + str(player.index):<8}"
+            f"{len(player.trials):>8,}{throughput:>28}"
+            f"{player.get_success_rate() * 100:>8.1f} %"
+        )
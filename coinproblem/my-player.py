@@ -1,23 +1,75 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
+import os
+import sys
 
 # Must import as `solver` rather than `coinproblem.solver` because this player
 # program will be run as an executable
 import solver
 
 
-def main():
+# Read and parse arguments to the player program
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--engine", "-e", choices=solver.ENGINES, default=solver.DEFAULT_ENGINE
+    )
+
+    parser.add_argument(
+        "--denominations",
+        type=solver.parse_denominations,
+        help="the coins to solve for (default: us)",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="memoize up to this many solutions, since inputs are often repeated",
+    )
+
+    parser.add_argument(
+        "--table",
+        help="answer queries from a table built with `python -m coinproblem.table`",
+    )
+
+    return parser.parse_args()
+
+
+def main(engine=solver.DEFAULT_ENGINE, denominations=None, cache_size=None, table=None):
+    if cache_size:
+        solver.enable_cache(cache_size)
+    if table:
+        solver.load_table(table)
+    # Accept the window of inputs offered by the referee (if any), so that a
+    # whole window of answers can be written at once; the first input always
+    # arrives on its own (see SPEC.md)
+    window = int(os.environ.get("COIN_PROBLEM_WINDOW", 1))
+    inputs_per_write = 1
     try:
+        if window > 1:
+            print("\0" + json.dumps({"window": window}, separators=(",", ":")))
         while True:
-            count, amount = input("").split(",")
-            coin_counts = solver.get_coin_counts(
-                total_coin_count=int(count), total_coin_amount=float(amount)
-            )
-            print("\0" + json.dumps(coin_counts, separators=(",", ":")))
+            answers = []
+            for _ in range(inputs_per_write):
+                count, amount = input("").split(",")
+                coin_counts = solver.get_coin_counts(
+                    total_coin_count=int(count),
+                    total_coin_amount=float(amount),
+                    engine=engine,
+                    denominations=denominations,
+                )
+                answers.append(
+                    "\0" + json.dumps(coin_counts, separators=(",", ":")) + "\n"
+                )
+            sys.stdout.write("".join(answers))
+            sys.stdout.flush()
+            inputs_per_write = window
     except Exception:
         print("\0{}")
 
 
 if __name__ == "__main__":
-    main()
+    main(**vars(get_cli_args()))
@@ -1,7 +1,30 @@
 #!/usr/bin/env python3
 
+import asyncio
+import importlib
+import json
+import os
+import re
+import shlex
+
 import pexpect
 
+from coinproblem.histogram import LatencyHistogram
+from coinproblem.timer import Deadline
+
+# The ways of talking to a player program: through a pseudo-terminal (with
+# pexpect), or through plain pipes (with asyncio)
+BACKENDS = ("pty", "pipe")
+
+# The largest amount of data to read from a pipe player at a time
+READ_SIZE = 1 << 16
+
+# A player spec naming a Python function to call directly (e.g.
+# coinproblem.solver:get_coin_counts), rather than a program to spawn
+IN_PROCESS_PATTERN = re.compile(
+    r"^(?P<module>[A-Za-z_][\w.]*):(?P<function>[A-Za-z_]\w*)$"
+)
+
 
 class Player(object):
     """Represents a generic Player program."""
@@ -11,12 +34,171 @@ class Player(object):
         self.total_correct = 0
         self.total_incorrect = 0
         self.total_error = 0
+        self.total_timeout = 0
+        self.window = 1
+        # The number of rounds left to play before the player's results start
+        # being kept (see reset_results)
+        self.warmup = 0
+        # The number of seconds the player may run for, and may take to answer
+        # each round (or None if there is no limit)
+        self.timeout = None
+        self.round_timeout = None
+        self.deadline = Deadline()
+        self.latencies = LatencyHistogram()
+        self.elapsed = 0
 
+    # Start the player program, offering it a window of inputs if one has been
+    # set (see SPEC.md); pexpect waits 50 ms before every send by default,
+    # which would be timed as part of every round, so it is turned off
     def start_program(self):
-        self.program = pexpect.spawnu(self.path)
+        env = None
+        if self.window > 1:
+            env = dict(os.environ, COIN_PROBLEM_WINDOW=str(self.window))
+        self.program = pexpect.spawnu(self.path, env=env)
+        self.program.delaybeforesend = None
+
+    def stop_program(self):
+        if getattr(self, "program", None) is not None:
+            self.program.terminate(force=True)
 
+    # Return the number of rounds answered per second, on average
+    def get_rounds_per_second(self):
+        if self.elapsed:
+            return (self.total_correct + self.total_incorrect) / self.elapsed
+        else:
+            return 0
+
+    # Return the number of rounds the player has been scored on
+    def get_round_count(self):
+        return (
+            self.total_correct
+            + self.total_incorrect
+            + self.total_error
+            + self.total_timeout
+        )
+
+    # Return the fraction of rounds answered correctly; incorrect answers,
+    # errors and timeouts all count against the player
     def get_success_rate(self):
-        if self.total_correct:
-            return 1 - (self.total_incorrect / self.total_correct)
+        round_count = self.get_round_count()
+        if round_count:
+            return self.total_correct / round_count
         else:
             return 0
+
+    # Discard every result so far (e.g. those from warm-up rounds)
+    def reset_results(self):
+        self.total_correct = 0
+        self.total_incorrect = 0
+        self.total_error = 0
+        self.total_timeout = 0
+        self.latencies = LatencyHistogram()
+
+
+class InProcessPlayer(Player):
+    """Represents a player function that is imported and called directly by
+    the referee, so that its rounds measure the algorithm alone (rather than
+    the cost of talking to another program through a pseudo-terminal); the
+    function is called with a count and amount, and must return a JSON-style
+    object of coin counts, just like a player program."""
+
+    def start_program(self):
+        match = IN_PROCESS_PATTERN.match(self.path)
+        module = importlib.import_module(match.group("module"))
+        self.function = getattr(module, match.group("function"))
+
+    def stop_program(self):
+        pass
+
+
+class PipePlayer(Player):
+    """Represents a player program that is driven through plain pipes from an
+    asyncio event loop, rather than through a pseudo-terminal by pexpect; each
+    round costs one buffered write and read (with no terminal line discipline
+    or per-read decoding in between), and any number of these players can be
+    driven at once from a single thread. Each answer is framed just as the
+    referee frames answers from other player programs (see split_answer)."""
+
+    async def start_process(self):
+        # Python players that don't flush their output would otherwise hold
+        # their answers in a buffer, since their output is no longer a terminal
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        if self.window > 1:
+            env["COIN_PROBLEM_WINDOW"] = str(self.window)
+        self.process = await asyncio.create_subprocess_exec(
+            *shlex.split(self.path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env,
+        )
+        self.buffer = b""
+
+    async def stop_process(self):
+        if self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+    # The process is stopped by the event loop that drives it (see
+    # stop_process), so there is nothing left to stop afterwards
+    def stop_program(self):
+        pass
+
+    async def send(self, text):
+        self.process.stdin.write(text.encode())
+        await self.process.stdin.drain()
+
+    # Read the next NUL-prefixed JSON answer from the player program
+    async def read_answer(self):
+        while True:
+            split = split_answer(self.buffer)
+            if split is not None:
+                frame, self.buffer = split
+                return json.loads(frame)
+            data = await self.process.stdout.read(READ_SIZE)
+            if not data:
+                raise EOFError("player program has exited")
+            self.buffer += data
+
+
+# Split the next NUL-prefixed JSON answer off the front of the given output
+# from a player program (as text or bytes), and return the answer's frame
+# along with the rest of the output, or None if the answer hasn't fully arrived
+# yet; an answer ends at a newline, at the next NUL, or (for a player that
+# prints neither) as soon as it is a complete JSON object; the frame is split
+# off before it is parsed, so that a malformed answer isn't read twice
+def split_answer(buffer):
+    nul, newline = ("\0", "\n") if isinstance(buffer, str) else (b"\0", b"\n")
+    start = buffer.find(nul)
+    if start == -1:
+        return None
+    end = min(
+        (
+            index
+            for index in (
+                buffer.find(newline, start + 1),
+                buffer.find(nul, start + 1),
+            )
+            if index != -1
+        ),
+        default=-1,
+    )
+    if end != -1:
+        return buffer[start + 1 : end], buffer[end:]
+    # A JSON object can't be parsed until its closing brace has arrived, so an
+    # answer that parses is complete
+    try:
+        json.loads(buffer[start + 1 :])
+    except ValueError:
+        return None
+    return buffer[start + 1 :], buffer[:0]
+
+
+# Return the kind of player for the given spec: an in-process player for a
+# module:function spec, or a player program (driven through the given backend)
+# for anything else
+def get_player(path, backend="pty"):
+    if IN_PROCESS_PATTERN.match(path):
+        return InProcessPlayer(path)
+    if backend == "pipe":
+        return PipePlayer(path)
+    return Player(path)
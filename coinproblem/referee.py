@@ -2,13 +2,27 @@
 # coding=utf-8
 
 import argparse
+import asyncio
+import concurrent.futures
+import contextlib
 import json
+import os
 import random
+import time
 
 import pexpect
 
+import coinproblem.leaderboard as leaderboard
 import coinproblem.timer as timer
-from coinproblem.player import Player
+from coinproblem.corpus import InputCorpus, generate_corpus
+from coinproblem.histogram import LatencyHistogram
+from coinproblem.player import (
+    BACKENDS,
+    InProcessPlayer,
+    PipePlayer,
+    get_player,
+    split_answer,
+)
 
 # Constants
 PENNY_VALUE = 0.01
@@ -16,10 +30,30 @@ NICKEL_VALUE = 0.05
 DIME_VALUE = 0.10
 QUARTER_VALUE = 0.25
 
+# The value of each coin type in integer cents
+COIN_CENTS = {"pennies": 1, "nickels": 5, "dimes": 10, "quarters": 25}
+
+
+# The largest window of inputs that may be offered to a player at once
+MAX_WINDOW = 128
+
+# The latency percentiles to report for each player
+LATENCY_PERCENTILES = (50, 90, 99)
 
 # Globals
 inputs = []
 next_input_index = 0
+# The pregenerated input corpus to read inputs from, if loaded (see --corpus)
+corpus = None
+
+
+# Parse a window size, which must be small enough that a whole window of input
+# fits comfortably in a terminal's input buffer
+def window_size(value):
+    window = int(value)
+    if not 1 <= window <= MAX_WINDOW:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_WINDOW}")
+    return window
 
 
 # Parse command-line arguments passed to referee player
@@ -30,16 +64,29 @@ def parse_cli_args():
         "players",
         metavar="player",
         nargs="+",
-        type=Player,
-        help="one or more player programs to execute",
+        help="one or more player programs to execute (or module:function specs "
+        "naming Python functions to call directly)",
     )
     parser.add_argument(
         "--timeout",
         "-t",
-        type=int,
+        type=float,
         default=10,
         help="the number of seconds each player will run before timing out",
     )
+    parser.add_argument(
+        "--round-timeout-ms",
+        type=float,
+        help="the number of milliseconds a player may take to answer each round; "
+        "slower rounds are scored as timeouts",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="pty",
+        help="talk to player programs through a pseudo-terminal (pty) or through "
+        "plain pipes from one event loop (pipe)",
+    )
     parser.add_argument(
         "--min-count",
         "--min",
@@ -56,8 +103,63 @@ def parse_cli_args():
         default=100,
         help="the maximum number of coins per coin type to be generated",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed the generated inputs, so that a run can be reproduced",
+    )
+    parser.add_argument(
+        "--corpus",
+        metavar="FILE",
+        help="read inputs from this corpus file (generating it if it is missing)",
+    )
+    parser.add_argument(
+        "--corpus-size",
+        type=int,
+        default=1_000_000,
+        help="the number of inputs to generate for a new corpus",
+    )
+    parser.add_argument(
+        "--window",
+        type=window_size,
+        default=1,
+        help="offer players this many inputs at a time (see SPEC.md)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="play this many rounds per player (and trial) before keeping results",
+    )
+    parser.add_argument(
+        "--leaderboard",
+        action="store_true",
+        help="rank players by their mean correct answers per second across "
+        "trials, with 95%% confidence intervals (requires --trials of at least 2)",
+    )
+    parser.add_argument(
+        "--report-json",
+        metavar="FILE",
+        help="write each player's results and latencies to this JSON file",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="run players (and trials) concurrently on this many processes",
+    )
+    parser.add_argument(
+        "--trials",
+        type=int,
+        default=1,
+        help="the number of times to run each player",
+    )
 
-    return parser.parse_args()
+    params = parser.parse_args()
+    if params.leaderboard and params.trials < 2:
+        parser.error("--leaderboard requires --trials of at least 2")
+    params.players = [get_player(path, params.backend) for path in params.players]
+    return params
 
 
 # Return the current number of coins
@@ -80,6 +182,17 @@ def get_total_amount(coin_counts):
     )
 
 
+# Return the value of the given coin counts in integer cents, which (unlike
+# the dollar amount) can be compared exactly
+def get_total_cents(coin_counts):
+    return (
+        coin_counts["quarters"] * COIN_CENTS["quarters"]
+        + coin_counts["dimes"] * COIN_CENTS["dimes"]
+        + coin_counts["nickels"] * COIN_CENTS["nickels"]
+        + coin_counts["pennies"] * COIN_CENTS["pennies"]
+    )
+
+
 def generate_new_input(min_count, max_count):
     coin_counts = {
         "pennies": random.randint(min_count, max_count),
@@ -107,19 +220,46 @@ def reset_inputs():
 
 # Get the next input, either generate it on-the-fly or retrieve from file
 def get_next_input(min_count, max_count):
-    global inputs
     global next_input_index
 
-    if next_input_index < len(inputs):
-        next_input = inputs[next_input_index]
-        next_input_index += 1
-    else:
-        next_input = generate_new_input(min_count, max_count)
-        inputs.append(next_input)
-        next_input_index += 1
+    next_input = get_input(next_input_index, min_count, max_count)
+    next_input_index += 1
     return next_input
 
 
+# Get the input at the given index, from the input corpus (if loaded), or from
+# the inputs generated so far (generating any more that are needed); players
+# that keep their own index therefore still receive the same inputs
+def get_input(index, min_count, max_count):
+    if corpus is not None:
+        return corpus.get_input(index)
+    while len(inputs) <= index:
+        inputs.append(generate_new_input(min_count, max_count))
+    return inputs[index]
+
+
+# Load the input corpus at the given path for every subsequent round,
+# generating it first (from the given seed, or a random one) if it is missing
+def load_corpus(corpus_path, size, min_count, max_count, seed=None):
+    global corpus
+
+    if not os.path.exists(corpus_path):
+        if seed is None:
+            seed = random.getrandbits(32)
+        generate_corpus(corpus_path, size, min_count, max_count, seed)
+    corpus = InputCorpus(corpus_path)
+    return corpus
+
+
+# Stop reading inputs from the input corpus
+def unload_corpus():
+    global corpus
+
+    if corpus is not None:
+        corpus.close()
+        corpus = None
+
+
 # Print information for the player's current input
 def print_next_input(player, count, amount):
     print(
@@ -129,33 +269,160 @@ def print_next_input(player, count, amount):
     )
 
 
-# Run a single round by generating random input and passing it to both player
-# programs
-def run_rounds_for_player(player, min_count, max_count):
+# Return whether the given coin counts solve the given input
+def is_correct_answer(next_input, output_data):
+    return get_total_count(output_data) == next_input["count"] and get_total_cents(
+        output_data
+    ) == round(next_input["amount"] * 100)
+
+
+# Score the player's answer for the given input
+def record_answer(player, next_input, output_data):
+    if is_correct_answer(next_input, output_data):
+        player.total_correct += 1
+        print("✓")
+    else:
+        player.total_incorrect += 1
+        print("×")
+
+
+# End the player's warm-up once it has played its warm-up rounds, discarding
+# everything recorded so far and restarting its clock, so that only rounds
+# played after any caches are filled (and imports are done) are scored
+def end_warmup(player):
+    if player.get_round_count() >= player.warmup:
+        player.reset_results()
+        player.start_time = time.perf_counter()
+        player.warmup = 0
+
+
+# Read the next NUL-prefixed JSON answer from the player program, waiting no
+# longer than the given deadline; since answers may arrive together (or without
+# a trailing newline), anything read past the answer is kept in the program's
+# buffer for the next call
+def read_answer(program, deadline):
+    while True:
+        split = split_answer(program.buffer)
+        if split is not None:
+            frame, program.buffer = split
+            return json.loads(frame)
+        program.buffer += program.read_nonblocking(
+            program.maxread, deadline.get_remaining()
+        )
+
+
+# Return the deadline for answering the current round, which is the round
+# timeout from now (but no later than the player's own deadline); the first
+# round after a player program starts also includes its start-up time, so it
+# is only held to the player's own deadline
+def get_round_deadline(player, first_round=False):
+    if first_round:
+        return timer.Deadline(parent=player.deadline)
+    return timer.Deadline(player.round_timeout, player.deadline)
+
+
+# Score the given inputs as timed out, since the player did not answer them
+# within the round timeout; the player program is restarted, since its late
+# answers would otherwise be read as the answers to later rounds
+def record_round_timeout(player, timed_out_inputs):
+    player.total_timeout += len(timed_out_inputs)
+    print(f"P{player.index} has timed out for {timed_out_inputs}")
+    player.stop_program()
     player.start_program()
+
+
+# Run rounds for a player that has been offered a window of inputs (see SPEC.md);
+# the first input is sent on its own, and if the player acknowledges the window
+# before answering it, inputs are sent a whole window at a time from then on;
+# otherwise, the player is driven in lockstep, one input at a time
+def run_windowed_rounds_for_player(player, min_count, max_count):
+    window = None
+    while True:
+        if player.warmup:
+            end_warmup(player)
+        next_inputs = [get_next_input(min_count, max_count) for _ in range(window or 1)]
+        answered = 0
+        try:
+            player.deadline.check()
+            if not player.program.isalive():
+                print(f"P{player.index} no longer alive")
+                continue
+            player.program.send(
+                "".join(
+                    f"{next_input['count']},{next_input['amount']}\n"
+                    for next_input in next_inputs
+                )
+            )
+            send_time = time.perf_counter_ns()
+            round_deadline = get_round_deadline(player, window is None)
+            for next_input in next_inputs:
+                print_next_input(player, **next_input)
+                output_data = read_answer(player.program, round_deadline)
+                if window is None:
+                    window = 1
+                    if isinstance(output_data, dict) and output_data.keys() == {
+                        "window"
+                    }:
+                        window = max(1, min(int(output_data["window"]), player.window))
+                        output_data = read_answer(player.program, round_deadline)
+                # The latency is only recorded once the answer has been scored,
+                # so that an answer that can't be scored isn't timed either
+                latency = time.perf_counter_ns() - send_time
+                record_answer(player, next_input, output_data)
+                player.latencies.record(latency)
+                answered += 1
+        except pexpect.exceptions.TIMEOUT:
+            # If it was the player's own timeout that expired, the next check
+            # of its deadline ends its rounds
+            if not player.deadline.has_expired():
+                record_round_timeout(player, next_inputs[answered:])
+                window = None
+        except timer.TimeoutError:
+            print()
+            print(f"referee timeout expired; ending P{player.index}")
+            print()
+            break
+        except Exception as error:
+            player.total_error += 1
+            print(f"error for P{player.index}: {error}")
+            # The answers to the rest of the window would otherwise be read as
+            # the answers to later rounds, so the player program is restarted
+            if next_inputs[answered + 1 :]:
+                player.stop_program()
+                player.start_program()
+                window = None
+
+
+# Run rounds for a player one input at a time
+def run_lockstep_rounds_for_player(player, min_count, max_count):
+    first_round = True
     while True:
+        if player.warmup:
+            end_warmup(player)
         next_input = get_next_input(min_count, max_count)
         try:
+            player.deadline.check()
             if not player.program.isalive():
                 print(f"P{player.index} no longer alive")
                 continue
             print_next_input(player, **next_input)
+            send_time = time.perf_counter_ns()
             player.program.sendline(
                 ",".join((str(next_input["count"]), str(next_input["amount"])))
             )
+            player.program.timeout = get_round_deadline(
+                player, first_round
+            ).get_remaining()
             player.program.expect_exact("\0")
             output_data = json.loads(player.program.buffer.strip())
-            if (
-                get_total_count(output_data) == next_input["count"]
-                and get_total_amount(output_data) == next_input["amount"]
-            ):
-                player.total_correct += 1
-                print("✓")
-            else:
-                player.total_incorrect += 1
-                print("×")
+            latency = time.perf_counter_ns() - send_time
+            record_answer(player, next_input, output_data)
+            player.latencies.record(latency)
+            first_round = False
         except pexpect.exceptions.TIMEOUT:
-            print(f"P{player.index} has timed out for {next_input}")
+            if not player.deadline.has_expired():
+                record_round_timeout(player, [next_input])
+                first_round = True
         except timer.TimeoutError:
             print()
             print(f"referee timeout expired; ending P{player.index}")
@@ -166,11 +433,177 @@ def run_rounds_for_player(player, min_count, max_count):
             print(f"error for P{player.index}: {error}")
 
 
+# Run rounds for an in-process player by calling its function directly; the
+# answers are checked just as they are for player programs, but only incorrect
+# answers and errors are printed, since printing every round would take far
+# longer than solving it; since a function call cannot be interrupted, a round
+# that overruns the round timeout is only scored as timed out once it returns
+def run_in_process_rounds_for_player(player, min_count, max_count):
+    function = player.function
+    deadline = player.deadline
+    round_timeout_ns = None
+    if player.round_timeout is not None:
+        round_timeout_ns = round(player.round_timeout * 1e9)
+    try:
+        while True:
+            if player.warmup:
+                end_warmup(player)
+            next_input = get_next_input(min_count, max_count)
+            try:
+                deadline.check()
+                send_time = time.perf_counter_ns()
+                output_data = function(next_input["count"], next_input["amount"])
+                elapsed = time.perf_counter_ns() - send_time
+                # As with player programs, the latency is only recorded once the
+                # answer has been scored as correct or incorrect, so rounds that
+                # time out are left out of it
+                if round_timeout_ns is not None and elapsed > round_timeout_ns:
+                    record_round_timeout(player, [next_input])
+                    continue
+                if is_correct_answer(next_input, output_data):
+                    player.total_correct += 1
+                else:
+                    player.total_incorrect += 1
+                    print(f"P{player.index}: incorrect answer for {next_input}")
+                player.latencies.record(elapsed)
+            except timer.TimeoutError:
+                raise
+            except Exception as error:
+                player.total_error += 1
+                print(f"error for P{player.index}: {error}")
+    except timer.TimeoutError:
+        print(f"referee timeout expired; ending P{player.index}")
+        print()
+
+
+# Run rounds for a player program through pipes (see PipePlayer), offering it
+# a window of inputs just as run_windowed_rounds_for_player does; each player
+# keeps its own index into the inputs, so that many players can be driven at
+# once from the same event loop, and (as with in-process players) only
+# incorrect answers, errors and timeouts are printed
+async def run_pipe_rounds_for_player(player, min_count, max_count):
+    player.deadline = timer.Deadline(player.timeout)
+    input_index = next_input_index
+    await player.start_process()
+    player.start_time = time.perf_counter()
+    window = None
+    try:
+        while True:
+            if player.warmup:
+                end_warmup(player)
+            player.deadline.check()
+            next_inputs = [
+                get_input(input_index + offset, min_count, max_count)
+                for offset in range(window or 1)
+            ]
+            input_index += len(next_inputs)
+            answered = 0
+            try:
+                await player.send(
+                    "".join(
+                        f"{next_input['count']},{next_input['amount']}\n"
+                        for next_input in next_inputs
+                    )
+                )
+                send_time = time.perf_counter_ns()
+                round_deadline = get_round_deadline(player, window is None)
+                for next_input in next_inputs:
+                    output_data = await asyncio.wait_for(
+                        player.read_answer(), round_deadline.get_remaining()
+                    )
+                    if window is None:
+                        window = 1
+                        if isinstance(output_data, dict) and output_data.keys() == {
+                            "window"
+                        }:
+                            window = max(
+                                1, min(int(output_data["window"]), player.window)
+                            )
+                            output_data = await asyncio.wait_for(
+                                player.read_answer(), round_deadline.get_remaining()
+                            )
+                    # As with the other backends, the latency is only recorded
+                    # once the answer has been scored
+                    latency = time.perf_counter_ns() - send_time
+                    if is_correct_answer(next_input, output_data):
+                        player.total_correct += 1
+                    else:
+                        player.total_incorrect += 1
+                        print(f"P{player.index}: incorrect answer for {next_input}")
+                    player.latencies.record(latency)
+                    answered += 1
+            except asyncio.TimeoutError:
+                if not player.deadline.has_expired():
+                    timed_out_inputs = next_inputs[answered:]
+                    player.total_timeout += len(timed_out_inputs)
+                    print(f"P{player.index} has timed out for {timed_out_inputs}")
+                    await player.stop_process()
+                    await player.start_process()
+                    window = None
+            except (EOFError, ConnectionError):
+                print(f"P{player.index} no longer alive")
+                break
+            except Exception as error:
+                player.total_error += 1
+                print(f"error for P{player.index}: {error}")
+                if next_inputs[answered + 1 :]:
+                    await player.stop_process()
+                    await player.start_process()
+                    window = None
+    except timer.TimeoutError:
+        print(f"referee timeout expired; ending P{player.index}")
+        print()
+    finally:
+        player.elapsed = time.perf_counter() - player.start_time
+        await player.stop_process()
+
+
+# Run rounds for every given pipe player at once, from a single event loop
+def run_pipe_players(players, min_count, max_count):
+    async def run_players():
+        await asyncio.gather(
+            *(
+                run_pipe_rounds_for_player(player, min_count, max_count)
+                for player in players
+            )
+        )
+
+    asyncio.run(run_players())
+
+
+# Run a single round by generating random input and passing it to both player
+# programs, timing every round along the way, until the player's timeout
+# expires; the warm-up rounds (if any) count towards the timeout, but not
+# towards the player's results or elapsed time
+def run_rounds_for_player(player, min_count, max_count):
+    if isinstance(player, PipePlayer):
+        run_pipe_players([player], min_count, max_count)
+        return
+    player.deadline = timer.Deadline(player.timeout)
+    player.start_program()
+    player.start_time = time.perf_counter()
+    try:
+        if isinstance(player, InProcessPlayer):
+            run_in_process_rounds_for_player(player, min_count, max_count)
+        elif getattr(player, "window", 1) > 1:
+            run_windowed_rounds_for_player(player, min_count, max_count)
+        else:
+            run_lockstep_rounds_for_player(player, min_count, max_count)
+    finally:
+        player.elapsed = time.perf_counter() - player.start_time
+
+
 # Print the parameters for this duel
-def print_duel_info(players, min_count, max_count, timeout):
+def print_duel_info(
+    players, min_count, max_count, timeout, round_timeout=None, warmup=0
+):
     print(f"min count per coin type: {min_count:,}")
     print(f"max count per coin type: {max_count:,}")
-    print(f"timeout per player: {timeout:,} s")
+    print(f"timeout per player: {timeout:,g} s")
+    if round_timeout is not None:
+        print(f"timeout per round: {round_timeout * 1e3:,g} ms")
+    if warmup:
+        print(f"warm-up rounds per player: {warmup:,}")
     print()
     print_player_info(players)
 
@@ -191,25 +624,274 @@ def print_duel_results(players):
         print(f"  incorrect = {player.total_incorrect:,}")
         print(f"  success = {player.get_success_rate() * 100:,.1f} %")
         print(f"  error = {player.total_error:,}")
+        print(f"  timeout = {player.total_timeout:,}")
+        print(f"  rounds/s = {player.get_rounds_per_second():,.1f}")
+        print(f"  latency = {format_latencies(player.latencies)}")
+
+
+# Format the latency percentiles (and the maximum latency) in milliseconds
+def format_latencies(latencies):
+    return ", ".join(
+        f"{name} {value / 1e6:,.3f} ms"
+        for name, value in get_latency_summary(latencies).items()
+    )
 
 
-def run_duel(players, min_count, max_count, timeout):
-    print_duel_info(players, min_count, max_count, timeout)
+# Return the reported latency percentiles (and the maximum) in nanoseconds
+def get_latency_summary(latencies):
+    summary = {
+        f"p{percentile}": latencies.get_percentile(percentile)
+        for percentile in LATENCY_PERCENTILES
+    }
+    summary["max"] = latencies.max
+    return summary
+
+
+# Write the results of every player to a JSON file, for use by dashboards
+def write_report(players, report_path):
+    report = {
+        "players": [
+            {
+                "index": player.index,
+                "path": player.path,
+                "correct": player.total_correct,
+                "incorrect": player.total_incorrect,
+                "error": player.total_error,
+                "timeout": player.total_timeout,
+                "elapsed_s": player.elapsed,
+                "rounds_per_second": player.get_rounds_per_second(),
+                "latency_ms": {
+                    name: value / 1e6
+                    for name, value in get_latency_summary(player.latencies).items()
+                },
+                **get_ranking_report(player),
+            }
+            for player in players
+        ]
+    }
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+# Return the leaderboard rank and correct answers per second of a ranked
+# player (see leaderboard.rank_players) for its entry in the report
+def get_ranking_report(player):
+    if not hasattr(player, "rank"):
+        return {}
+    return {
+        "rank": player.rank,
+        "correct_per_second": {
+            "mean": player.throughput,
+            "ci95": player.throughput_interval,
+            "trials": player.throughputs,
+        },
+    }
+
+
+def run_duel(
+    players, min_count, max_count, timeout, window=1, round_timeout=None, warmup=0
+):
+    print_duel_info(players, min_count, max_count, timeout, round_timeout, warmup)
 
     for player in players:
-        reset_inputs()
-        with timer.Timer(timeout):
+        player.window = window
+        player.timeout = timeout
+        player.round_timeout = round_timeout
+        player.warmup = warmup
+    # Pipe players are all driven at once, from one event loop, while every
+    # other player is run on its own
+    for player in players:
+        if not isinstance(player, PipePlayer):
+            reset_inputs()
             run_rounds_for_player(player, min_count, max_count)
+    pipe_players = [player for player in players if isinstance(player, PipePlayer)]
+    if pipe_players:
+        reset_inputs()
+        run_pipe_players(pipe_players, min_count, max_count)
 
     print_duel_results(players)
 
     return players
 
 
+# Run one trial of one player, in a worker process; seeding the random number
+# generator the same way for every player guarantees they all receive the same
+# sequence of inputs, while the per-round output is discarded so that
+# concurrent players don't garble each other's output
+def run_player_trial(
+    path,
+    index,
+    min_count,
+    max_count,
+    timeout,
+    seed,
+    window=1,
+    corpus_path=None,
+    round_timeout=None,
+    warmup=0,
+    backend="pty",
+):
+    global inputs
+    global next_input_index
+    global corpus
+
+    random.seed(seed)
+    inputs = []
+    reset_inputs()
+    # Each trial starts reading from a different (seeded) point in the corpus,
+    # which has already been generated by the parent process
+    if corpus_path:
+        corpus = InputCorpus(corpus_path)
+        next_input_index = seed % len(corpus)
+    player = get_player(path, backend)
+    player.index = index
+    player.window = window
+    player.timeout = timeout
+    player.round_timeout = round_timeout
+    player.warmup = warmup
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            run_rounds_for_player(player, min_count, max_count)
+        finally:
+            player.stop_program()
+    return {
+        "correct": player.total_correct,
+        "incorrect": player.total_incorrect,
+        "error": player.total_error,
+        "timeout": player.total_timeout,
+        "elapsed": player.elapsed,
+        "latencies": player.latencies,
+    }
+
+
+# Print the aggregated results of every trial for each player as one table
+def print_tournament_results(players):
+    print(
+        f"{'player':<8}{'trials':>8}{'correct':>12}{'incorrect':>12}"
+        f"{'error':>10}{'timeout':>10}{'success':>10}{'rounds/s':>12}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for player in players:
+        print(
+            f"{'P' + str(player.index):<8}{len(player.trials):>8,}"
+            f"{player.total_correct:>12,}{player.total_incorrect:>12,}"
+            f"{player.total_error:>10,}{player.total_timeout:>10,}"
+            f"{player.get_success_rate() * 100:>8.1f} %"
+            f"{player.get_rounds_per_second():>12,.1f}"
+            f"{player.latencies.get_percentile(50) / 1e6:>10,.3f}"
+            f"{player.latencies.get_percentile(99) / 1e6:>10,.3f}"
+            f"{player.latencies.max / 1e6:>10,.3f}"
+        )
+
+
+# Run every trial of every player concurrently on a pool of worker processes,
+# each with its own timeout; every player gets the same inputs for a given
+# trial (but each trial gets different inputs)
+def run_tournament(
+    players,
+    min_count,
+    max_count,
+    timeout,
+    workers=None,
+    trials=1,
+    window=1,
+    corpus_path=None,
+    round_timeout=None,
+    warmup=0,
+    backend="pty",
+):
+    print_duel_info(players, min_count, max_count, timeout, round_timeout, warmup)
+    print(f"running {trials:,} trial(s) per player...")
+    print()
+
+    trial_seeds = [random.getrandbits(32) for _ in range(trials)]
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = {
+            player: [
+                executor.submit(
+                    run_player_trial,
+                    player.path,
+                    player.index,
+                    min_count,
+                    max_count,
+                    timeout,
+                    seed,
+                    window,
+                    corpus_path,
+                    round_timeout,
+                    warmup,
+                    backend,
+                )
+                for seed in trial_seeds
+            ]
+            for player in players
+        }
+        for player, trial_futures in futures.items():
+            player.trials = [future.result() for future in trial_futures]
+            player.total_correct = sum(t["correct"] for t in player.trials)
+            player.total_incorrect = sum(t["incorrect"] for t in player.trials)
+            player.total_error = sum(t["error"] for t in player.trials)
+            player.total_timeout = sum(t["timeout"] for t in player.trials)
+            player.elapsed = sum(t["elapsed"] for t in player.trials)
+            player.latencies = LatencyHistogram()
+            for trial in player.trials:
+                player.latencies.merge(trial["latencies"])
+
+    print_tournament_results(players)
+
+    return players
+
+
 def main():
     try:
         params = parse_cli_args()
-        run_duel(**vars(params))
+        round_timeout = None
+        if params.round_timeout_ms is not None:
+            round_timeout = params.round_timeout_ms / 1e3
+        if params.seed is not None:
+            random.seed(params.seed)
+        if params.corpus:
+            load_corpus(
+                params.corpus,
+                params.corpus_size,
+                params.min_count,
+                params.max_count,
+                params.seed,
+            )
+            print(
+                f"input corpus: {params.corpus} ({len(corpus):,} inputs "
+                f"from {corpus.min_count:,} to {corpus.max_count:,} coins "
+                f"per coin type, seed {corpus.seed})"
+            )
+        if params.workers or params.trials > 1:
+            players = run_tournament(
+                params.players,
+                params.min_count,
+                params.max_count,
+                params.timeout,
+                workers=params.workers,
+                trials=params.trials,
+                window=params.window,
+                corpus_path=params.corpus,
+                round_timeout=round_timeout,
+                warmup=params.warmup,
+                backend=params.backend,
+            )
+            if params.leaderboard:
+                print()
+                leaderboard.print_leaderboard(leaderboard.rank_players(players))
+        else:
+            players = run_duel(
+                params.players,
+                params.min_count,
+                params.max_count,
+                params.timeout,
+                window=params.window,
+                round_timeout=round_timeout,
+                warmup=params.warmup,
+            )
+        if params.report_json:
+            write_report(players, params.report_json)
     except KeyboardInterrupt:
         print()
 
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+
+import coinproblem.batch as batch
+import coinproblem.solver as solver
+
+# The largest amount of data to read from a client at a time
+READ_SIZE = 1 << 16
+
+# Requests whose count or amount is larger than this are solved one at a time,
+# since batch.solve_batch works in 64-bit integers
+MAX_BATCH_VALUE = 1 << 40
+
+
+# Read and parse arguments to the server program
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--socket",
+        "-s",
+        help="the path of a Unix domain socket to listen on (instead of TCP)",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="the host to listen on for TCP connections",
+    )
+    parser.add_argument(
+        "--port",
+        "-p",
+        type=int,
+        default=8765,
+        help="the port to listen on for TCP connections",
+    )
+    parser.add_argument(
+        "--engine", "-e", choices=solver.ENGINES, default=solver.DEFAULT_ENGINE
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="memoize up to this many solutions across all clients",
+    )
+    parser.add_argument(
+        "--table",
+        help="answer queries from a table built with `python -m coinproblem.table`",
+    )
+
+    return parser.parse_args()
+
+
+# Format the given coin counts as an answer line, in the same way as a player
+# program would (see SPEC.md)
+def format_answer(coin_counts):
+    return "\0" + json.dumps(coin_counts, separators=(",", ":")) + "\n"
+
+
+# Parse a count,amount request line, raising a ValueError if it is malformed
+def parse_request(line):
+    count, amount = line.split(b",")
+    return batch.parse_row(count, amount)
+
+
+# Answer a single count,amount request line; malformed requests (including
+# amounts too large to convert to cents) are answered with {}
+def answer_request(line, engine):
+    try:
+        coin_counts = solver.get_coin_counts(*parse_request(line), engine)
+    except (ValueError, OverflowError):
+        coin_counts = {}
+    return format_answer(coin_counts)
+
+
+# Answer a batch of request lines (see answer_request), in order; if the
+# requests would all be solved by the lattice engine (as they are by the auto
+# engine when no table is loaded), they are solved together with
+# batch.solve_batch, rather than one at a time
+def answer_requests(lines, engine):
+    if engine != "lattice" and not (engine == "auto" and solver.table is None):
+        return "".join(answer_request(line, engine) for line in lines)
+    answers = [None] * len(lines)
+    batch_indices = []
+    counts = []
+    amounts = []
+    for index, line in enumerate(lines):
+        try:
+            count, amount = parse_request(line)
+        except ValueError:
+            answers[index] = format_answer({})
+            continue
+        if abs(count) > MAX_BATCH_VALUE or abs(amount) > MAX_BATCH_VALUE:
+            answers[index] = answer_request(line, engine)
+            continue
+        batch_indices.append(index)
+        counts.append(count)
+        amounts.append(amount)
+    if batch_indices:
+        coin_counts, solvable = batch.solve_batch(counts, amounts)
+        for index, row, is_solvable in zip(batch_indices, coin_counts, solvable):
+            answers[index] = format_answer(
+                dict(zip(solver.COIN_TYPES, map(int, row))) if is_solvable else None
+            )
+    return "".join(answers)
+
+
+# Answer every request line from a client; since clients may pipeline their
+# requests, every complete line that has arrived is solved as one batch (see
+# answer_requests), and the answers are written back (in order) with a single
+# write; batches are solved in a worker thread, so that one client's batch
+# doesn't hold up every other client until it is done
+async def handle_client(reader, writer, engine=solver.DEFAULT_ENGINE):
+    loop = asyncio.get_running_loop()
+    partial_line = b""
+    try:
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                break
+            lines = (partial_line + data).split(b"\n")
+            partial_line = lines.pop()
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                answers = await loop.run_in_executor(
+                    None, answer_requests, lines, engine
+                )
+                writer.write(answers.encode())
+                await writer.drain()
+        if partial_line.strip():
+            answers = await loop.run_in_executor(
+                None, answer_requests, [partial_line], engine
+            )
+            writer.write(answers.encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+# Start a server on the given Unix domain socket (or, if none is given, on the
+# given TCP host and port), and return it once it is listening
+async def start_server(
+    socket_path=None, host="127.0.0.1", port=8765, engine=solver.DEFAULT_ENGINE
+):
+    async def handle(reader, writer):
+        await handle_client(reader, writer, engine)
+
+    if socket_path:
+        return await asyncio.start_unix_server(handle, path=socket_path)
+    return await asyncio.start_server(handle, host=host, port=port)
+
+
+async def serve(
+    socket_path=None, host="127.0.0.1", port=8765, engine=solver.DEFAULT_ENGINE
+):
+    server = await start_server(socket_path, host, port, engine)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    params = get_cli_args()
+    if params.cache_size:
+        solver.enable_cache(params.cache_size)
+    if params.table:
+        solver.load_table(params.table)
+    try:
+        asyncio.run(serve(params.socket, params.host, params.port, params.engine))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 
+import array
+import bisect
 import collections
-import itertools
-import math
+import functools
+import mmap
+import operator
+import struct
+import time
+import zlib
 
 # Constants
 PENNY_VALUE = 0.01
@@ -15,6 +21,28 @@ AMOUNT_VALUES = [PENNY_VALUE, NICKEL_VALUE, DIME_VALUE, QUARTER_VALUE]
 # The order of coin types that maps to the sequence of values
 COIN_TYPES = ["pennies", "nickels", "dimes", "quarters"]
 
+# The value of each coin type in integer cents, in the same order as COIN_TYPES
+CENT_VALUES = [1, 5, 10, 25]
+
+COIN_CENTS = dict(zip(COIN_TYPES, CENT_VALUES))
+
+# Named sets of denominations (each a map of coin types to their values in
+# cents) that can be solved for in place of the usual US coins
+DENOMINATION_SETS = {
+    "us": COIN_CENTS,
+    "us-half-dollars": {**COIN_CENTS, "half-dollars": 50},
+    "euro": {
+        "1-cent": 1,
+        "2-cent": 2,
+        "5-cent": 5,
+        "10-cent": 10,
+        "20-cent": 20,
+        "50-cent": 50,
+        "1-euro": 100,
+        "2-euro": 200,
+    },
+}
+
 # A map of known dollar amounts (under $1) and the coin combinations known to
 # sum to those respective amounts; the structure is an OrderedDict with the
 # keys sorted from smallest to largest; each row of additions/subtractions must
@@ -39,14 +67,107 @@ COIN_SUMS = collections.OrderedDict(
     )
 )
 
+# The same map as above, keyed by integer cents instead, from largest to smallest
+COIN_SUMS_CENTS = [
+    (round(coin_sum * 100), coin_combination)
+    for coin_sum, coin_combination in reversed(COIN_SUMS.items())
+]
+
+
+class CoinCounts(object):
+    """A compact, integer-only set of coin counts, which keeps a running total
+    of its value in cents; the solver works on these internally, and only
+    converts them to dicts for output."""
+
+    __slots__ = ("pennies", "nickels", "dimes", "quarters", "cents")
+
+    def __init__(self, pennies=0, nickels=0, dimes=0, quarters=0):
+        self.pennies = pennies
+        self.nickels = nickels
+        self.dimes = dimes
+        self.quarters = quarters
+        self.cents = pennies + 5 * nickels + 10 * dimes + 25 * quarters
+
+    @classmethod
+    def from_dict(cls, coin_counts):
+        return cls(*(coin_counts[coin_type] for coin_type in COIN_TYPES))
+
+    @property
+    def count(self):
+        return self.pennies + self.nickels + self.dimes + self.quarters
+
+    def __getitem__(self, coin_type):
+        return getattr(self, coin_type)
+
+    # Yield the counts in the same order as COIN_TYPES
+    def __iter__(self):
+        yield self.pennies
+        yield self.nickels
+        yield self.dimes
+        yield self.quarters
+
+    def __eq__(self, other):
+        if not isinstance(other, CoinCounts):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return (
+            f"CoinCounts(pennies={self.pennies}, nickels={self.nickels}, "
+            f"dimes={self.dimes}, quarters={self.quarters})"
+        )
+
+    # Replace the given number of coins of one type with coins of another type
+    def substitute(self, coin_to_replace, coin_to_replace_with, number=1):
+        setattr(self, coin_to_replace, getattr(self, coin_to_replace) - number)
+        setattr(
+            self, coin_to_replace_with, getattr(self, coin_to_replace_with) + number
+        )
+        self.cents += number * (
+            COIN_CENTS[coin_to_replace_with] - COIN_CENTS[coin_to_replace]
+        )
+
+    # Add the given (possibly negative) number of coins of each type
+    def adjust(self, coin_diffs, multiplier=1):
+        for coin_type, coin_diff in coin_diffs.items():
+            setattr(self, coin_type, getattr(self, coin_type) + coin_diff * multiplier)
+            self.cents += COIN_CENTS[coin_type] * coin_diff * multiplier
+
+    def as_dict(self):
+        return {
+            "pennies": self.pennies,
+            "nickels": self.nickels,
+            "dimes": self.dimes,
+            "quarters": self.quarters,
+        }
+
+
+# The integer solution lattice for a given coin count and amount; once the
+# nickels/dimes/quarters offsets above pennies are accounted for, every
+# solution can be written as dimes = base_dimes + 4t and quarters = s, where
+# 0 <= t <= max_step and max(0, min_quarters - t) <= s <= (base_sum - 9t) // 6
+SolutionLattice = collections.namedtuple(
+    "SolutionLattice",
+    ("total_coin_count", "base_dimes", "base_sum", "min_quarters", "max_step"),
+)
+
 
 # Return the current number of coins
 def get_current_count(coin_counts):
     return sum(coin_counts.values())
 
 
-# Return the current dollar amount sum for the given coin counts
-def get_current_amount(coin_counts):
+# Return the current dollar amount sum for the given coin counts (of the given
+# denominations, if not the usual US coins)
+def get_current_amount(coin_counts, denominations=None):
+    if denominations is not None:
+        return (
+            sum(
+                coin_counts[coin_type] * cents
+                for coin_type, cents in denominations.items()
+            )
+            / 100
+        )
     return round(
         sum(
             (
@@ -60,112 +181,929 @@ def get_current_amount(coin_counts):
     )
 
 
+# Convert a dollar amount to an integer number of cents
+def get_amount_cents(total_coin_amount):
+    return round(total_coin_amount * 100)
+
+
 # Compute the required number of pennies by using the least-significant decimal
 # digit of the total amount
 def get_penny_count(total_coin_amount):
-    adjusted_coin_amount = round(total_coin_amount * 10, 2)
-    return round((adjusted_coin_amount - math.floor(adjusted_coin_amount)) * 10) % 5
+    return get_amount_cents(total_coin_amount) % 5
 
 
-# Repeatedly replace a type of coin with another type of coin, until the
-# current coin amount equals the given total
+# Replace a type of coin with another (less valuable) type of coin, one coin
+# at a time, until the current amount no longer exceeds the given total; the
+# number of replacements needed is computed up front rather than one by one
 def converge_to_amount(
-    coin_counts, total_coin_amount, coin_to_replace, coin_to_replace_with
+    coin_counts, total_coin_cents, coin_to_replace, coin_to_replace_with
 ):
-    while (
-        get_current_amount(coin_counts) > total_coin_amount
-        and coin_counts[coin_to_replace] > 0
-    ):
-        coin_counts[coin_to_replace] -= 1
-        coin_counts[coin_to_replace_with] += 1
+    excess_cents = coin_counts.cents - total_coin_cents
+    if excess_cents <= 0:
+        return
+    cents_per_replacement = (
+        COIN_CENTS[coin_to_replace] - COIN_CENTS[coin_to_replace_with]
+    )
+    replacements = max(
+        0,
+        min(-(-excess_cents // cents_per_replacement), coin_counts[coin_to_replace]),
+    )
+    coin_counts.substitute(coin_to_replace, coin_to_replace_with, replacements)
+    if stats is not None:
+        stats.count("converge_substitutions", replacements)
 
 
 # The convergence above isn't perfect; the remaining diff is typically
 # less than a dollar, so to narrow in on that exact value with greater
 # precision, perform coin substitions that are known to achieve that diff
-def perform_adjustment_substitutions(coin_counts, total_coin_amount):
-    current_amount = get_current_amount(coin_counts)
-    amount_diff = round(total_coin_amount - current_amount, 2)
+def perform_adjustment_substitutions(coin_counts, total_coin_cents):
+    cents_diff = total_coin_cents - coin_counts.cents
 
-    if amount_diff == 0:
+    if cents_diff == 0:
         return
 
     # If remaining difference is a multiple of a key in the COIN_SUMS table,
     # adjust the current coin counts according to that respective sum
-    for coin_sum, coin_combination in reversed(COIN_SUMS.items()):
-        if round(amount_diff % coin_sum, 2) == 0:
-            for coin_type, coin_diff in coin_combination.items():
-                coin_counts[coin_type] += coin_diff * int(amount_diff // coin_sum)
+    for candidates, (coin_sum, coin_combination) in enumerate(COIN_SUMS_CENTS, 1):
+        if cents_diff % coin_sum == 0:
+            coin_counts.adjust(coin_combination, cents_diff // coin_sum)
             break
+    if stats is not None:
+        stats.count("adjustment_candidates", candidates)
+
+
+# Reduce the (count, cents) system to its solution lattice; subtracting the
+# count equation from the cents equation leaves 4n + 9d + 24q = cents - count,
+# so dimes are fixed modulo 4 and the rest follows from nickels + 6q; return
+# None if no non-negative solution exists
+def get_solution_lattice(total_coin_count, total_coin_cents):
+    remainder = total_coin_cents - total_coin_count
+    if total_coin_count < 0 or remainder < 0:
+        return None
+    base_dimes = remainder % 4
+    base_sum = (remainder - 9 * base_dimes) // 4
+    if base_sum < 0:
+        return None
+    # Pennies must be non-negative, which puts a lower bound on t + s
+    min_quarters = -((total_coin_count - base_sum - base_dimes) // 5)
+    max_step = min(base_sum // 9, (base_sum - 6 * min_quarters) // 3)
+    if max_step < 0:
+        return None
+    return SolutionLattice(
+        total_coin_count, base_dimes, base_sum, min_quarters, max_step
+    )
+
+
+# Return whether any combination of coins satisfies the given count and amount,
+# in constant time (i.e. without searching for one)
+def is_solvable(total_coin_count, total_coin_amount):
+    return (
+        get_solution_lattice(total_coin_count, get_amount_cents(total_coin_amount))
+        is not None
+    )
+
+
+# Return the coin counts at the given (t, s) point on the solution lattice
+def get_lattice_point(lattice, step, quarters):
+    nickels = lattice.base_sum - 9 * step - 6 * quarters
+    dimes = lattice.base_dimes + 4 * step
+    return CoinCounts(
+        lattice.total_coin_count - nickels - dimes - quarters,
+        nickels,
+        dimes,
+        quarters,
+    )
+
+
+# Solve the problem in constant time by picking the first point on the
+# solution lattice, using only integer arithmetic
+def solve_with_lattice(total_coin_count, total_coin_amount):
+    lattice = get_solution_lattice(
+        total_coin_count, get_amount_cents(total_coin_amount)
+    )
+    if lattice is None:
+        return None
+    return get_lattice_point(lattice, 0, max(0, lattice.min_quarters))
+
+
+# Lazily yield every combination of coin counts that satisfies the given count
+# and amount, by walking the solution lattice one point at a time
+def iter_coin_counts(total_coin_count, total_coin_amount):
+    lattice = get_solution_lattice(
+        total_coin_count, get_amount_cents(total_coin_amount)
+    )
+    if lattice is None:
+        return
+    for step in range(lattice.max_step + 1):
+        for quarters in range(
+            max(0, lattice.min_quarters - step),
+            (lattice.base_sum - 9 * step) // 6 + 1,
+        ):
+            yield get_lattice_point(lattice, step, quarters)
 
 
-def get_partial_sums(count, amount):
-    map = collections.defaultdict(list)
-    sums = set()
+# Return the number of combinations of coin counts that satisfy the given count
+# and amount, without enumerating them; the upper bound on quarters drops by
+# exactly 3 every two steps, and the lower bound by 1 every step until it
+# reaches zero, so each bound sums as an arithmetic series
+def count_solutions(total_coin_count, total_coin_amount):
+    lattice = get_solution_lattice(
+        total_coin_count, get_amount_cents(total_coin_amount)
+    )
+    if lattice is None:
+        return 0
+    max_step = lattice.max_step
+    upper_sum = 0
+    for parity in (0, 1):
+        if parity > max_step:
+            continue
+        last = (max_step - parity) // 2
+        first_bound = (lattice.base_sum - 9 * parity) // 6
+        upper_sum += (last + 1) * first_bound - 3 * last * (last + 1) // 2
+    lower_sum = 0
+    if lattice.min_quarters > 0:
+        last = min(lattice.min_quarters, max_step)
+        lower_sum = (last + 1) * lattice.min_quarters - last * (last + 1) // 2
+    return (max_step + 1) + upper_sum - lower_sum
+
+
+# Parse an objective to optimize solutions for, which is either a "min:" or
+# "max:" prefix followed by a coin type (e.g. min:pennies or max:quarters), or
+# a map of coin types to weights whose weighted sum is minimized; return the
+# weight for each coin type (ordered as in COIN_TYPES) to minimize
+def parse_objective(objective):
+    if isinstance(objective, str):
+        direction, _, coin_type = objective.partition(":")
+        if direction not in ("min", "max"):
+            raise ValueError(f"invalid objective: {objective!r}")
+        objective = {coin_type: 1 if direction == "min" else -1}
+    unknown_types = set(objective) - set(COIN_TYPES)
+    if unknown_types:
+        raise ValueError(f"unknown coin type(s): {', '.join(sorted(unknown_types))}")
+    return tuple(objective.get(coin_type, 0) for coin_type in COIN_TYPES)
+
+
+# Return the points on the solution lattice where a linear objective may be
+# optimal; for a fixed step, the objective is best at the lowest or highest
+# number of quarters, and along either bound it is linear in the step, except
+# that the upper bound drops by 3 every two steps (so it is linear within each
+# parity) and the lower bound flattens out at zero once the step reaches
+# min_quarters; the best point is therefore at the ends of one of those pieces
+def get_objective_candidates(lattice):
+    for step in sorted(
+        {
+            0,
+            1,
+            lattice.min_quarters - 1,
+            lattice.min_quarters,
+            lattice.min_quarters + 1,
+            lattice.max_step - 1,
+            lattice.max_step,
+        }
+    ):
+        if 0 <= step <= lattice.max_step:
+            yield step, max(0, lattice.min_quarters - step)
+            yield step, (lattice.base_sum - 9 * step) // 6
+
+
+# Solve the problem for the combination of coins that minimizes the given
+# objective (see parse_objective), in constant time and without enumerating
+# solutions; ties go to the solution with the fewest dimes, then quarters
+def solve_with_objective(total_coin_count, total_coin_amount, objective):
+    weights = parse_objective(objective)
+    lattice = get_solution_lattice(
+        total_coin_count, get_amount_cents(total_coin_amount)
+    )
+    if lattice is None:
+        return None
+    return min(
+        (
+            get_lattice_point(lattice, step, quarters)
+            for step, quarters in get_objective_candidates(lattice)
+        ),
+        key=lambda coin_counts: (
+            sum(map(operator.mul, weights, coin_counts)),
+            coin_counts.dimes,
+            coin_counts.quarters,
+        ),
+    )
+
+
+# Return the point on the solution lattice nearest to the given coin counts,
+# matching their dimes and then their quarters as closely as the lattice allows
+def get_nearest_lattice_point(lattice, coin_counts):
+    step = min(
+        max(0, round((coin_counts.dimes - lattice.base_dimes) / 4)), lattice.max_step
+    )
+    quarters = min(
+        max(coin_counts.quarters, lattice.min_quarters - step, 0),
+        (lattice.base_sum - 9 * step) // 6,
+    )
+    return get_lattice_point(lattice, step, quarters)
+
+
+# The count-preserving substitutions in COIN_SUMS_CENTS, as (cents, nickels,
+# dimes, quarters) tuples, for re-solving from a previous solution
+RESOLVE_SUBSTITUTIONS = [
+    (
+        coin_sum,
+        coin_combination["nickels"],
+        coin_combination["dimes"],
+        coin_combination["quarters"],
+    )
+    for coin_sum, coin_combination in COIN_SUMS_CENTS
+]
 
-    for i in range(count + 1):
-        for j in range(count + 1):
-            partial_sum = count - (i + j)
-            map[i + j].append((i, j))
-            if partial_sum in map:
-                for x, y in map[partial_sum]:
-                    if (y * AMOUNT_VALUES[3]) <= amount:
-                        sums.update(itertools.permutations((i, j, x, y)))
 
-    return sums
+# Re-solve the problem for a new count and amount, starting from the previous
+# solution to a nearby problem (e.g. while sweeping through amounts a cent at a
+# time) rather than from scratch; pennies make up the change in count, trading
+# up to two pennies for nickels (or vice versa) makes the change in cents a
+# multiple of five, and then one known substitution (see COIN_SUMS) covers the
+# rest, using the largest substitution that the previous solution has enough
+# coins for; if there is none, the nearest point on the new solution lattice is
+# returned instead (or None if the problem has no solution at all)
+def resolve_coin_counts(previous_coin_counts, total_coin_count, total_coin_amount):
+    total_coin_cents = get_amount_cents(total_coin_amount)
+    pennies, nickels, dimes, quarters = (
+        previous_coin_counts[coin_type] for coin_type in COIN_TYPES
+    )
+    pennies += total_coin_count - (pennies + nickels + dimes + quarters)
+    cents_diff = total_coin_cents - (pennies + 5 * nickels + 10 * dimes + 25 * quarters)
+    # Each penny traded for a nickel adds 4 cents, and 4 * 4 is 1 (mod 5), so
+    # trading either this many pennies for nickels, or five fewer (i.e. trading
+    # nickels for pennies), makes the change in cents a multiple of five; the
+    # smaller trade is tried first
+    pennies_to_trade = (4 * cents_diff) % 5
+    trades = (pennies_to_trade, pennies_to_trade - 5)
+    for swaps in trades if pennies_to_trade <= 2 else reversed(trades):
+        if pennies - swaps < 0 or nickels + swaps < 0:
+            continue
+        swapped_diff = cents_diff - 4 * swaps
+        for coin_sum, nickel_diff, dime_diff, quarter_diff in RESOLVE_SUBSTITUTIONS:
+            if swapped_diff % coin_sum:
+                continue
+            multiplier = swapped_diff // coin_sum
+            coin_counts = CoinCounts(
+                pennies - swaps,
+                nickels + swaps + nickel_diff * multiplier,
+                dimes + dime_diff * multiplier,
+                quarters + quarter_diff * multiplier,
+            )
+            if min(coin_counts.nickels, coin_counts.dimes, coin_counts.quarters) >= 0:
+                return coin_counts.as_dict()
+    if stats is not None:
+        stats.count("resolve_fallbacks")
+    lattice = get_solution_lattice(total_coin_count, total_coin_cents)
+    if lattice is None:
+        return None
+    return get_nearest_lattice_point(
+        lattice, CoinCounts.from_dict(previous_coin_counts)
+    ).as_dict()
 
 
-# Search all possible permutations of coin counts until a satisfactory
-# permutation is found
+# Return the sorted values of every way to split the given number of coins
+# between two coin types; the index of each value is the number of coins of the
+# more valuable type
+def get_pair_sums(coin_count, low_value, high_value):
+    return array.array(
+        "q",
+        range(
+            coin_count * low_value, coin_count * high_value + 1, high_value - low_value
+        ),
+    )
+
+
+# Meet in the middle by splitting the coins into a (pennies, nickels) half and
+# a (dimes, quarters) half, and then looking up each sum in one half against
+# the sums in the other; only O(count) sums are held in memory at a time
+def get_partial_sums(total_coin_count, total_coin_cents):
+    for low_count in range(total_coin_count + 1):
+        high_count = total_coin_count - low_count
+        # Skip splits that cannot possibly reach the amount
+        if not (
+            low_count * CENT_VALUES[0] + high_count * CENT_VALUES[2]
+            <= total_coin_cents
+            <= low_count * CENT_VALUES[1] + high_count * CENT_VALUES[3]
+        ):
+            continue
+        low_sums = get_pair_sums(low_count, CENT_VALUES[0], CENT_VALUES[1])
+        high_sums = get_pair_sums(high_count, CENT_VALUES[2], CENT_VALUES[3])
+        # Candidates are counted once per split (rather than once per sum), so
+        # that the inner loop costs the same whether or not stats are enabled
+        if stats is not None:
+            stats.count("brute_force_splits")
+            stats.count("brute_force_candidates", len(high_sums))
+        for quarters, high_sum in enumerate(high_sums):
+            nickels = bisect.bisect_left(low_sums, total_coin_cents - high_sum)
+            if (
+                nickels < len(low_sums)
+                and low_sums[nickels] + high_sum == total_coin_cents
+            ):
+                yield (low_count - nickels, nickels, high_count - quarters, quarters)
+
+
+# Search the possible coin counts until a satisfactory combination is found,
+# or return None if there is no such combination (which is known up front, so
+# unsolvable problems never pay for a full search)
 def brute_force(total_coin_count, total_coin_amount):
-    count_permutations = get_partial_sums(total_coin_count, total_coin_amount)
+    if not is_solvable(total_coin_count, total_coin_amount):
+        return None
     counts_list = next(
-        p
-        for p in count_permutations
-        if round(sum(c * v for c, v in zip(p, AMOUNT_VALUES)), 2) == total_coin_amount
+        get_partial_sums(total_coin_count, get_amount_cents(total_coin_amount)), None
     )
-    return {
-        coin_type: coin_count for coin_count, coin_type in zip(counts_list, COIN_TYPES)
-    }
-
+    if counts_list is None:
+        return None
+    return CoinCounts(*counts_list)
 
-# Return a JSON object of coin counts
-def get_coin_counts(total_coin_count, total_coin_amount):
-    coin_counts = {}
-    coin_counts["pennies"] = get_penny_count(total_coin_amount)
 
-    coin_counts["quarters"] = (total_coin_count - coin_counts["pennies"]) // 3
-    coin_counts["dimes"] = (total_coin_count - coin_counts["pennies"]) // 3
-    coin_counts["nickels"] = (total_coin_count - coin_counts["pennies"]) // 3
-    coin_counts["nickels"] += total_coin_count - get_current_count(coin_counts)
+# Approximate the amount by swapping coins, then patch up the remainder with
+# known substitutions (or brute force, as a last resort)
+def solve_with_heuristic(total_coin_count, total_coin_amount):
+    total_coin_cents = get_amount_cents(total_coin_amount)
+    pennies = get_penny_count(total_coin_amount)
+    third = (total_coin_count - pennies) // 3
+    coin_counts = CoinCounts(
+        pennies=pennies,
+        nickels=total_coin_count - pennies - 2 * third,
+        dimes=third,
+        quarters=third,
+    )
 
     # Convert to the specified total amount as closely as possible
+    if stats is not None:
+        stats.start_phase("converge")
     converge_to_amount(
         coin_counts=coin_counts,
-        total_coin_amount=total_coin_amount,
+        total_coin_cents=total_coin_cents,
         coin_to_replace="quarters",
         coin_to_replace_with="dimes",
     )
     converge_to_amount(
         coin_counts=coin_counts,
-        total_coin_amount=total_coin_amount,
+        total_coin_cents=total_coin_cents,
         coin_to_replace="dimes",
         coin_to_replace_with="nickels",
     )
 
     # Make minor adjustments to land on the exact value
+    if stats is not None:
+        stats.start_phase("adjust")
     perform_adjustment_substitutions(
-        coin_counts=coin_counts, total_coin_amount=total_coin_amount
+        coin_counts=coin_counts, total_coin_cents=total_coin_cents
     )
 
     # If amount is still not correct, fall back to the brute force approach
     if (
-        get_current_count(coin_counts) != total_coin_count
-        or get_current_amount(coin_counts) != total_coin_amount
-        or any(count < 0 for count in coin_counts.values())
+        coin_counts.count != total_coin_count
+        or coin_counts.cents != total_coin_cents
+        or any(count < 0 for count in coin_counts)
     ):
+        if stats is not None:
+            stats.start_phase("brute_force")
+            stats.count("brute_force_fallbacks")
         coin_counts = brute_force(
             total_coin_count=total_coin_count, total_coin_amount=total_coin_amount
         )
 
+    if stats is not None:
+        stats.end_phase()
     return coin_counts
+
+
+# Parse a set of denominations from either the name of a set in
+# DENOMINATION_SETS, or a comma-separated list of type=cents pairs
+def parse_denominations(denominations_spec):
+    if denominations_spec in DENOMINATION_SETS:
+        return DENOMINATION_SETS[denominations_spec]
+    denominations = {}
+    for pair in denominations_spec.split(","):
+        coin_type, _, cents = pair.partition("=")
+        try:
+            denominations[coin_type.strip()] = int(cents)
+        except ValueError:
+            raise ValueError(f"invalid denomination: {pair!r}") from None
+    validate_denominations(denominations)
+    return denominations
+
+
+# Raise a ValueError unless the given denominations are a non-empty map of
+# coin types to distinct, positive values in cents
+def validate_denominations(denominations):
+    if not denominations:
+        raise ValueError("at least one denomination is required")
+    if any(cents < 1 for cents in denominations.values()):
+        raise ValueError("denominations must be worth at least one cent")
+    if len(set(denominations.values())) != len(denominations):
+        raise ValueError("denominations must have distinct values")
+
+
+# Return the largest amount that the coins other than the most valuable one
+# (whose values are given in ascending order) make up in any solution with the
+# fewest coins; among any (largest value) of those coins, some subset adds up
+# to a multiple of the largest value, and could be swapped for fewer of the
+# largest coins, so there are never more than (largest value - 1) of them
+def get_change_limit(coin_values):
+    if len(coin_values) < 2:
+        return 0
+    return (coin_values[-1] - 1) * coin_values[-2]
+
+
+# Compute the fewest coins needed to make each amount (with the given values,
+# in ascending order), along with the index of the last coin added to reach it,
+# so that solutions can be reconstructed; unreachable amounts take -1 for both;
+# once (largest value) amounts in a row are each best made by adding a largest
+# coin to the amount one largest value below, so is every larger amount, so the
+# table stops there (or at the change limit, see get_change_limit), which is
+# usually far sooner; tables are cached, since they only depend on the values
+@functools.lru_cache(maxsize=32)
+def get_change_table(coin_values):
+    limit = get_change_limit(coin_values)
+    largest_value = coin_values[-1]
+    min_coins = array.array("l", [0])
+    last_coins = array.array("l", [-1])
+    cycle_length = 0
+    amount = 0
+    while amount < limit and cycle_length < largest_value:
+        amount += 1
+        fewest = last_coin = -1
+        for index, value in enumerate(coin_values):
+            if value > amount:
+                break
+            coin_count = min_coins[amount - value]
+            if coin_count >= 0 and (fewest < 0 or coin_count + 1 < fewest):
+                fewest = coin_count + 1
+                last_coin = index
+        min_coins.append(fewest)
+        last_coins.append(last_coin)
+        if amount < largest_value:
+            continue
+        previous_count = min_coins[amount - largest_value]
+        if fewest == (previous_count + 1 if previous_count >= 0 else -1):
+            cycle_length += 1
+        else:
+            cycle_length = 0
+    return min_coins, last_coins
+
+
+# Solve for an arbitrary set of denominations; taking one coin of the smallest
+# value as the baseline, the problem becomes making up the remaining amount
+# with at most the given number of (more valuable) coins, which is the classic
+# change-making problem; beyond the end of the change table (see
+# get_change_table), the rest of any amount is best made up with more of the
+# largest coins, so only the amounts within the table need to be tried
+def solve_with_denominations(total_coin_count, total_coin_amount, denominations):
+    validate_denominations(denominations)
+    coin_types = sorted(denominations, key=denominations.get)
+    filler_type = coin_types[0]
+    filler_cents = denominations[filler_type]
+    remainder = get_amount_cents(total_coin_amount) - total_coin_count * filler_cents
+    if total_coin_count < 0 or remainder < 0:
+        return None
+
+    coin_counts = dict.fromkeys(denominations, 0)
+    if len(coin_types) == 1:
+        if remainder != 0:
+            return None
+        coin_counts[filler_type] = total_coin_count
+        return coin_counts
+
+    coin_values = tuple(denominations[t] - filler_cents for t in coin_types[1:])
+    min_coins, last_coins = get_change_table(coin_values)
+    largest_value = coin_values[-1]
+    limit = len(min_coins) - 1
+
+    fewest = None
+    for largest_count in range(
+        max(0, -(-(remainder - limit) // largest_value)),
+        remainder // largest_value + 1,
+    ):
+        amount = remainder - largest_count * largest_value
+        if min_coins[amount] >= 0 and (
+            fewest is None or min_coins[amount] + largest_count < fewest[0]
+        ):
+            fewest = (min_coins[amount] + largest_count, largest_count, amount)
+    if fewest is None or fewest[0] > total_coin_count:
+        return None
+
+    coin_total, largest_count, amount = fewest
+    coin_counts[coin_types[-1]] = largest_count
+    while amount:
+        index = last_coins[amount]
+        coin_counts[coin_types[index + 1]] += 1
+        amount -= coin_values[index]
+    coin_counts[filler_type] = total_coin_count - coin_total
+    return coin_counts
+
+
+# Solve the problem by looking it up in the loaded answer table (see
+# load_table), or with the lattice engine if it is outside the table
+def solve_with_table(total_coin_count, total_coin_amount):
+    if table is not None:
+        try:
+            return table.lookup(total_coin_count, get_amount_cents(total_coin_amount))
+        except KeyError:
+            pass
+    return solve_with_lattice(total_coin_count, total_coin_amount)
+
+
+# Return the name of the engine that the auto engine would solve the given
+# problem with: the answer table if it is loaded and covers the problem, or
+# otherwise the lattice engine, which is faster than the heuristic at every
+# size (see coinproblem.bench) and detects unsolvable problems in constant time
+def choose_engine(total_coin_count, total_coin_amount):
+    if table is not None and table.covers(
+        total_coin_count, get_amount_cents(total_coin_amount)
+    ):
+        return "table"
+    return "lattice"
+
+
+# Solve the problem with whichever engine suits it best (see choose_engine)
+def solve_with_auto(total_coin_count, total_coin_amount):
+    return ENGINES[choose_engine(total_coin_count, total_coin_amount)](
+        total_coin_count, total_coin_amount
+    )
+
+
+# The registry of solver engines; every engine takes a total coin count and
+# total coin amount, and returns CoinCounts (or None if there is no solution)
+ENGINES = {
+    "auto": solve_with_auto,
+    "heuristic": solve_with_heuristic,
+    "table": solve_with_table,
+    "lattice": solve_with_lattice,
+    "exhaustive": brute_force,
+}
+
+DEFAULT_ENGINE = "auto"
+
+
+# Add an engine to the registry, so that it can be chosen by name anywhere an
+# engine can (e.g. the --engine option of each program)
+def register_engine(name, solve):
+    ENGINES[name] = solve
+
+
+class LRUCache(object):
+    """A bounded mapping that evicts its least recently used entry when full,
+    and counts its hits, misses and evictions."""
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("cache size must be at least 1")
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Return the value for the given key (marking it as the most recently
+    # used), or the given default if there is no such key
+    def get(self, key, default=None):
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
+# The memoization cache for get_coin_counts(), if enabled
+cache = None
+
+
+# Start memoizing get_coin_counts() results in a new cache of the given size
+def enable_cache(maxsize=1024):
+    global cache
+
+    cache = LRUCache(maxsize)
+    return cache
+
+
+def disable_cache():
+    global cache
+
+    cache = None
+
+
+# Return the hit/miss/eviction counters for the cache, or None if disabled
+def get_cache_stats():
+    if cache is None:
+        return None
+    return cache.get_stats()
+
+
+class SolverStats(object):
+    """Counters of which path each solve took, how much work it did along the
+    way, and how long each phase of solving took (in nanoseconds)."""
+
+    def __init__(self):
+        self.paths = collections.Counter()
+        self.counters = collections.Counter()
+        self.phase_times = collections.Counter()
+        self.engine_times = collections.Counter()
+        self.phase = None
+        self.phase_start_time = 0
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    # End the current phase (if any), and start timing the given phase
+    def start_phase(self, phase):
+        now = time.perf_counter_ns()
+        if self.phase is not None:
+            self.phase_times[self.phase] += now - self.phase_start_time
+        self.phase = phase
+        self.phase_start_time = now
+
+    def end_phase(self):
+        if self.phase is not None:
+            self.phase_times[self.phase] += (
+                time.perf_counter_ns() - self.phase_start_time
+            )
+            self.phase = None
+
+    def get_stats(self):
+        return {
+            "paths": dict(self.paths),
+            "counters": dict(self.counters),
+            "phase_ns": dict(self.phase_times),
+            "engine_ns": dict(self.engine_times),
+        }
+
+
+# The instrumentation counters for the solver, if enabled; every instrumented
+# site checks this before doing anything else, so disabled stats cost one
+# global lookup per site
+stats = None
+
+
+# Start counting solver paths, work and phase times from zero
+def enable_stats():
+    global stats
+
+    stats = SolverStats()
+    return stats
+
+
+def disable_stats():
+    global stats
+
+    stats = None
+
+
+# Return the solver's path/work counters and phase times, or None if disabled
+def get_stats():
+    if stats is None:
+        return None
+    return stats.get_stats()
+
+
+class TableError(Exception):
+    pass
+
+
+class AnswerTable(object):
+    """A precomputed, memory-mapped table of one solution for every (count,
+    cents) pair up to some maximum count; see coinproblem.table for how these
+    tables are built."""
+
+    MAGIC = b"COINTBL\0"
+    VERSION = 1
+    # The magic bytes, format version, maximum count, number of entries and
+    # CRC-32 checksum of every entry
+    HEADER = struct.Struct("<8sHIQI")
+    # The nickels, dimes and quarters for an entry (pennies make up the rest)
+    ENTRY = struct.Struct("<3H")
+    # The entry value for an unsolvable (count, cents) pair
+    UNSOLVABLE = 0xFFFF
+
+    def __init__(self, path):
+        with open(path, "rb") as table_file:
+            self.map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.validate()
+        except TableError:
+            self.close()
+            raise
+
+    # Return the number of entries for every count below the given count; each
+    # count has an entry for every amount from count to 25 * count cents
+    @staticmethod
+    def get_entry_index(total_coin_count):
+        return 12 * total_coin_count * (total_coin_count - 1) + total_coin_count
+
+    # Raise a TableError if the table was built for a different format, or if
+    # its contents do not match its checksum; the checksum is computed a chunk
+    # at a time, so the table never needs to be fully resident in memory
+    def validate(self):
+        if len(self.map) < self.HEADER.size:
+            raise TableError("answer table is truncated")
+        magic, version, max_count, entry_count, checksum = self.HEADER.unpack_from(
+            self.map
+        )
+        if magic != self.MAGIC:
+            raise TableError("file is not an answer table")
+        if version != self.VERSION:
+            raise TableError(
+                f"answer table has format version {version}, "
+                f"expected {self.VERSION}; please rebuild it"
+            )
+        if (
+            entry_count != self.get_entry_index(max_count + 1)
+            or len(self.map) != self.HEADER.size + entry_count * self.ENTRY.size
+        ):
+            raise TableError("answer table is truncated")
+        actual_checksum = 0
+        for offset in range(self.HEADER.size, len(self.map), 1 << 20):
+            actual_checksum = zlib.crc32(
+                self.map[offset : offset + (1 << 20)], actual_checksum
+            )
+        if actual_checksum != checksum:
+            raise TableError("answer table checksum does not match")
+        self.max_count = max_count
+
+    # Return whether the table has an entry for the given count and cents
+    def covers(self, total_coin_count, total_coin_cents):
+        return (
+            0 <= total_coin_count <= self.max_count
+            and total_coin_count <= total_coin_cents <= 25 * total_coin_count
+        )
+
+    # Return the tabulated coin counts for the given count and cents (or None if
+    # there is no solution); raise a KeyError if the pair is outside the table
+    def lookup(self, total_coin_count, total_coin_cents):
+        if not self.covers(total_coin_count, total_coin_cents):
+            raise KeyError((total_coin_count, total_coin_cents))
+        nickels, dimes, quarters = self.ENTRY.unpack_from(
+            self.map,
+            self.HEADER.size
+            + self.ENTRY.size
+            * (
+                self.get_entry_index(total_coin_count)
+                + total_coin_cents
+                - total_coin_count
+            ),
+        )
+        if nickels == self.UNSOLVABLE:
+            return None
+        return CoinCounts(
+            total_coin_count - nickels - dimes - quarters, nickels, dimes, quarters
+        )
+
+    def close(self):
+        self.map.close()
+
+
+# The precomputed answer table consulted by get_coin_counts(), if loaded
+table = None
+
+
+# Answer queries from the answer table at the given path (for as long as it is
+# loaded); raise a TableError if the table is stale or corrupt
+def load_table(path):
+    global table
+
+    unload_table()
+    table = AnswerTable(path)
+    return table
+
+
+def unload_table():
+    global table
+
+    if table is not None:
+        table.close()
+        table = None
+
+
+# Return the CoinCounts solution from the cache or the given engine (in that
+# order of preference), or None if there is no solution; the auto engine is
+# resolved to a concrete engine first, and table lookups bypass the cache since
+# they are already as fast as a cache hit; since the result may be shared with
+# the cache, it must not be mutated
+def find_coin_counts(total_coin_count, total_coin_amount, engine=DEFAULT_ENGINE):
+    if engine == "auto":
+        engine = choose_engine(total_coin_count, total_coin_amount)
+
+    if cache is None or engine == "table":
+        return solve_with_engine(total_coin_count, total_coin_amount, engine)
+
+    # Amounts are keyed by integer cents so that equivalent floats (e.g. 0.3
+    # and 0.1 + 0.2) share an entry
+    key = (total_coin_count, get_amount_cents(total_coin_amount), engine)
+    coin_counts = cache.get(key, False)
+    if coin_counts is False:
+        coin_counts = solve_with_engine(total_coin_count, total_coin_amount, engine)
+        cache.put(key, coin_counts)
+    elif stats is not None:
+        stats.paths["cache"] += 1
+    return coin_counts
+
+
+# Solve the problem with the given engine, recording the path taken (i.e. the
+# engine, and whether the heuristic had to fall back to brute force) and the
+# time spent in each engine
+def solve_with_engine(total_coin_count, total_coin_amount, engine):
+    if stats is None:
+        return ENGINES[engine](total_coin_count, total_coin_amount)
+    fallbacks = stats.counters["brute_force_fallbacks"]
+    start_time = time.perf_counter_ns()
+    coin_counts = ENGINES[engine](total_coin_count, total_coin_amount)
+    stats.engine_times[engine] += time.perf_counter_ns() - start_time
+    if stats.counters["brute_force_fallbacks"] > fallbacks:
+        stats.paths[f"{engine}+brute_force"] += 1
+    else:
+        stats.paths[engine] += 1
+    return coin_counts
+
+
+# Return a JSON object of coin counts (as a new dict that is safe to mutate);
+# the counts are of the usual US coins, unless a different map of coin types to
+# values in cents is given; if an objective is given (see parse_objective), the
+# solution that best meets it is returned, rather than whichever solution the
+# engine finds first
+def get_coin_counts(
+    total_coin_count,
+    total_coin_amount,
+    engine=DEFAULT_ENGINE,
+    denominations=None,
+    objective=None,
+):
+    if denominations is not None and denominations != COIN_CENTS:
+        if objective is not None:
+            raise ValueError("objectives are only supported for US coins")
+        return get_denomination_counts(
+            total_coin_count, total_coin_amount, denominations
+        )
+    if objective is not None:
+        coin_counts = solve_with_objective(
+            total_coin_count, total_coin_amount, objective
+        )
+    else:
+        coin_counts = find_coin_counts(total_coin_count, total_coin_amount, engine)
+    if coin_counts is None:
+        return None
+    return coin_counts.as_dict()
+
+
+# Return a JSON object of coin counts for the given denominations, from the
+# cache if enabled
+def get_denomination_counts(total_coin_count, total_coin_amount, denominations):
+    if stats is not None:
+        stats.paths["denominations"] += 1
+    if cache is None:
+        return solve_with_denominations(
+            total_coin_count, total_coin_amount, denominations
+        )
+    key = (
+        total_coin_count,
+        get_amount_cents(total_coin_amount),
+        tuple(denominations.items()),
+    )
+    coin_counts = cache.get(key, False)
+    if coin_counts is False:
+        coin_counts = solve_with_denominations(
+            total_coin_count, total_coin_amount, denominations
+        )
+        cache.put(key, coin_counts)
+    return coin_counts and dict(coin_counts)
+
+
+# Yield each of the given amounts of the given number of coins along with its
+# solution (or None if it has none); only the first amount is solved from
+# scratch (with the given engine), and each one after that is re-solved from the
+# last solution found
+def sweep_coin_counts(total_coin_count, total_coin_amounts, engine=DEFAULT_ENGINE):
+    previous_coin_counts = None
+    for total_coin_amount in total_coin_amounts:
+        if previous_coin_counts is None:
+            coin_counts = get_coin_counts(total_coin_count, total_coin_amount, engine)
+        else:
+            coin_counts = resolve_coin_counts(
+                previous_coin_counts, total_coin_count, total_coin_amount
+            )
+        if coin_counts is not None:
+            previous_coin_counts = coin_counts
+        yield total_coin_amount, coin_counts
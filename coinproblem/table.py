@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import argparse
+import array
+import os
+import sys
+import zlib
+
+import coinproblem.batch as batch
+import coinproblem.solver as solver
+from coinproblem.solver import AnswerTable
+
+
+# Read and parse arguments to the table builder
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("path", help="the answer table file to write")
+
+    parser.add_argument(
+        "--max-count",
+        type=int,
+        default=1000,
+        help="the largest coin count to tabulate (the table grows with its square)",
+    )
+
+    return parser.parse_args()
+
+
+# Pack the nickels, dimes and quarters for each row into table entries
+def pack_entries(coin_counts, solvable):
+    if batch.numpy is not None:
+        entries = coin_counts[:, 1:].astype("<u2")
+        entries[~solvable] = AnswerTable.UNSOLVABLE
+        return entries.tobytes()
+    entries = array.array("H")
+    for row, is_solvable in zip(coin_counts, solvable):
+        if is_solvable:
+            entries.extend(row[1:])
+        else:
+            entries.extend((AnswerTable.UNSOLVABLE,) * 3)
+    if sys.byteorder == "big":
+        entries.byteswap()
+    return entries.tobytes()
+
+
+# Write an answer table with one (lattice) solution for every feasible amount
+# of every count up to the given maximum; the table is written to a temporary
+# file first, so that a half-built table never replaces a good one
+def build_table(path, max_count):
+    if not 0 <= max_count < AnswerTable.UNSOLVABLE:
+        raise ValueError(f"max count must be between 0 and {AnswerTable.UNSOLVABLE}")
+    temp_path = f"{path}.tmp"
+    checksum = 0
+    with open(temp_path, "wb") as table_file:
+        table_file.write(bytes(AnswerTable.HEADER.size))
+        for count in range(max_count + 1):
+            cents = range(count, 25 * count + 1)
+            entries = pack_entries(
+                *batch.solve_batch([count] * len(cents), [c / 100 for c in cents])
+            )
+            checksum = zlib.crc32(entries, checksum)
+            table_file.write(entries)
+        table_file.seek(0)
+        table_file.write(
+            AnswerTable.HEADER.pack(
+                AnswerTable.MAGIC,
+                AnswerTable.VERSION,
+                max_count,
+                AnswerTable.get_entry_index(max_count + 1),
+                checksum,
+            )
+        )
+    os.replace(temp_path, path)
+
+
+def main():
+    params = get_cli_args()
+    build_table(params.path, params.max_count)
+    table = solver.load_table(params.path)
+    print(f"wrote answer table for counts up to {table.max_count:,} to {params.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,42 @@
 #!/usr/bin/env python3
 
-# https://stackoverflow.com/a/22348885/560642
-
-import signal
+import time
 
 
 class TimeoutError(Exception):
     pass
 
 
-class Timer:
-    def __init__(self, seconds=1, error_message="TimeoutError"):
-        self.seconds = seconds
-        self.error_message = error_message
-
-    def handle_timeout(self, signum, frame):
-        raise TimeoutError(self.error_message)
-
-    def __enter__(self):
-        signal.signal(signal.SIGALRM, self.handle_timeout)
-        signal.alarm(self.seconds)
-
-    def __exit__(self, type, value, traceback):
-        signal.alarm(0)
+class Deadline(object):
+    """A point in time on the monotonic performance counter (the same clock
+    the referee times rounds with), after which a time budget is spent; unlike
+    a signal-based alarm, a deadline has sub-microsecond resolution and works
+    in any thread or process, since it is checked by the code that it bounds.
+    A deadline without a number of seconds never expires, and a deadline with
+    a parent expires no later than its parent."""
+
+    def __init__(self, seconds=None, parent=None):
+        self.end = None
+        if seconds is not None:
+            self.end = time.perf_counter_ns() + round(seconds * 1e9)
+        if parent is not None and parent.end is not None:
+            self.end = parent.end if self.end is None else min(self.end, parent.end)
+
+    # Return the number of seconds left before the deadline (or None if it
+    # never expires)
+    def get_remaining(self):
+        if self.end is None:
+            return None
+        return max(0, self.end - time.perf_counter_ns()) / 1e9
+
+    # Return whether the deadline has passed (as of the given reading of the
+    # performance counter, if the caller has just taken one)
+    def has_expired(self, now=None):
+        if self.end is None:
+            return False
+        return (time.perf_counter_ns() if now is None else now) >= self.end
+
+    # Raise a TimeoutError if the deadline has passed
+    def check(self, error_message="TimeoutError"):
+        if self.has_expired():
+            raise TimeoutError(error_message)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import argparse
+import concurrent.futures
+import heapq
+import json
+import os
+import sys
+import time
+
+import coinproblem.solver as solver
+
+# The largest count (and amount, in dollars) allowed by the specification
+MAX_SPEC_COUNT = 65_535
+
+# The version of the checkpoint file format
+CHECKPOINT_VERSION = 1
+
+
+# Read and parse arguments to the verification program
+def get_cli_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--min-count",
+        "--min",
+        metavar="--min",
+        type=int,
+        default=0,
+        help="the smallest total coin count to verify",
+    )
+    parser.add_argument(
+        "--max-count",
+        "--max",
+        metavar="--max",
+        type=int,
+        default=MAX_SPEC_COUNT,
+        help="the largest total coin count to verify",
+    )
+    parser.add_argument(
+        "--engine", "-e", choices=solver.ENGINES, default=solver.DEFAULT_ENGINE
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="the number of worker processes to verify shards with",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=16,
+        help="the number of consecutive coin counts in each shard",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100,
+        help="report any input that takes longer than this to solve",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="the number of slowest inputs to keep track of",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="verify-checkpoint.json",
+        help="the file to save progress to, and to resume from if it exists",
+    )
+
+    return parser.parse_args()
+
+
+# Return the reason the given answer is wrong for the given count and cents,
+# or None if it is right; every amount with a solution must be solved, and
+# every amount without one must be reported as unsolvable (i.e. None); since
+# is_solvable shares its lattice with the engines being verified, whether an
+# amount has a solution is instead settled by brute force (see
+# solver.get_partial_sums), which is only needed when no valid solution is
+# returned
+def get_failure_reason(total_coin_count, total_coin_cents, coin_counts):
+    if coin_counts is not None:
+        if any(count < 0 for count in coin_counts.values()):
+            reason = f"negative coin counts: {coin_counts}"
+        elif solver.get_current_count(coin_counts) != total_coin_count:
+            reason = f"wrong coin count: {coin_counts}"
+        elif round(solver.get_current_amount(coin_counts) * 100) != total_coin_cents:
+            reason = f"wrong coin amount: {coin_counts}"
+        else:
+            return None
+    solution = next(solver.get_partial_sums(total_coin_count, total_coin_cents), None)
+    if coin_counts is None:
+        return None if solution is None else "no solution returned"
+    if solution is None:
+        return f"solution returned for an unsolvable input: {coin_counts}"
+    return reason
+
+
+# Verify every amount (from none to all quarters) of every count in the given
+# range of counts, and return the number of inputs verified, every failure
+# (including inputs over the time budget), and the slowest inputs
+def verify_shard(counts, engine, budget_ns, slowest_count):
+    failures = []
+    slowest = []
+    verified = 0
+    for total_coin_count in counts:
+        for total_coin_cents in range(total_coin_count, 25 * total_coin_count + 1):
+            start_time = time.perf_counter_ns()
+            try:
+                coin_counts = solver.get_coin_counts(
+                    total_coin_count, total_coin_cents / 100, engine
+                )
+            except Exception as error:
+                coin_counts = error
+            elapsed = time.perf_counter_ns() - start_time
+            verified += 1
+            if isinstance(coin_counts, Exception):
+                reason = f"error: {coin_counts!r}"
+            else:
+                reason = get_failure_reason(
+                    total_coin_count, total_coin_cents, coin_counts
+                )
+            if reason is None and elapsed > budget_ns:
+                reason = f"over budget: {elapsed / 1e6:,.1f} ms"
+            if reason is not None:
+                failures.append([total_coin_count, total_coin_cents / 100, reason])
+            entry = (elapsed, total_coin_count, total_coin_cents / 100)
+            if len(slowest) < slowest_count:
+                heapq.heappush(slowest, entry)
+            elif slowest and entry > slowest[0]:
+                heapq.heapreplace(slowest, entry)
+    return {
+        "verified": verified,
+        "failures": failures,
+        "slowest": [list(entry) for entry in slowest],
+    }
+
+
+# Return the ranges of counts covered by each shard
+def get_shards(min_count, max_count, shard_size):
+    return [
+        range(start, min(start + shard_size, max_count + 1))
+        for start in range(min_count, max_count + 1, shard_size)
+    ]
+
+
+# Load the checkpoint at the given path, or start a new one if there is none;
+# a checkpoint can only be resumed with the same parameters it was started with
+def load_checkpoint(checkpoint_path, params):
+    if not os.path.exists(checkpoint_path):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "params": params,
+            "completed_shards": [],
+            "verified": 0,
+            "failures": [],
+            "slowest": [],
+        }
+    with open(checkpoint_path) as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{checkpoint_path} is not a compatible checkpoint")
+    if checkpoint["params"] != params:
+        raise ValueError(
+            f"{checkpoint_path} was started with different parameters "
+            f"({checkpoint['params']}); delete it to start over"
+        )
+    return checkpoint
+
+
+# Save the checkpoint to a temporary file first, so that an interrupted save
+# never corrupts the last good checkpoint
+def save_checkpoint(checkpoint_path, checkpoint):
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, "w") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(temp_path, checkpoint_path)
+
+
+# Add the results of a shard to the checkpoint, keeping only the slowest inputs
+def merge_shard_results(checkpoint, shard_index, results, slowest_count):
+    checkpoint["completed_shards"].append(shard_index)
+    checkpoint["verified"] += results["verified"]
+    checkpoint["failures"].extend(results["failures"])
+    checkpoint["slowest"] = heapq.nlargest(
+        slowest_count, checkpoint["slowest"] + results["slowest"]
+    )
+
+
+# Verify every shard that the checkpoint has not already completed across a
+# pool of worker processes, saving the checkpoint as each shard completes and
+# printing failures as they are found; at most a couple of shards per worker
+# are in flight at any one time
+def run_verification(
+    min_count=0,
+    max_count=MAX_SPEC_COUNT,
+    engine=solver.DEFAULT_ENGINE,
+    workers=None,
+    shard_size=16,
+    budget_ms=100,
+    slowest_count=10,
+    checkpoint_path="verify-checkpoint.json",
+):
+    workers = workers or os.cpu_count()
+    params = {
+        "min_count": min_count,
+        "max_count": max_count,
+        "engine": engine,
+        "shard_size": shard_size,
+        "budget_ms": budget_ms,
+    }
+    checkpoint = load_checkpoint(checkpoint_path, params)
+    shards = get_shards(min_count, max_count, shard_size)
+    completed_shards = set(checkpoint["completed_shards"])
+    pending_shards = iter(
+        (index, counts)
+        for index, counts in enumerate(shards)
+        if index not in completed_shards
+    )
+    print(
+        f"verifying counts {min_count:,} to {max_count:,} in {len(shards):,} "
+        f"shards ({len(completed_shards):,} already done)",
+        flush=True,
+    )
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        in_flight = {}
+        while True:
+            for index, counts in pending_shards:
+                future = executor.submit(
+                    verify_shard, counts, engine, budget_ms * 1e6, slowest_count
+                )
+                in_flight[future] = index
+                if len(in_flight) >= workers * 2:
+                    break
+            if not in_flight:
+                break
+            done, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                index = in_flight.pop(future)
+                results = future.result()
+                for count, amount, reason in results["failures"]:
+                    print(f"FAIL {count},{amount}: {reason}", flush=True)
+                merge_shard_results(checkpoint, index, results, slowest_count)
+                save_checkpoint(checkpoint_path, checkpoint)
+                print(
+                    f"shard {index:,} done (counts {shards[index].start:,} to "
+                    f"{shards[index].stop - 1:,}); "
+                    f"{len(checkpoint['completed_shards']):,}/{len(shards):,} "
+                    f"shards, {checkpoint['verified']:,} inputs verified",
+                    flush=True,
+                )
+    return checkpoint
+
+
+# Print the overall results of a verification
+def print_verification_results(checkpoint):
+    print()
+    print(f"inputs verified: {checkpoint['verified']:,}")
+    print(f"failures: {len(checkpoint['failures']):,}")
+    print("slowest inputs:")
+    for elapsed, count, amount in checkpoint["slowest"]:
+        print(f"  {count},{amount}: {elapsed / 1e6:,.3f} ms")
+
+
+def main():
+    params = get_cli_args()
+    try:
+        checkpoint = run_verification(
+            min_count=params.min_count,
+            max_count=params.max_count,
+            engine=params.engine,
+            workers=params.workers,
+            shard_size=params.shard_size,
+            budget_ms=params.budget_ms,
+            slowest_count=params.slowest,
+            checkpoint_path=params.checkpoint,
+        )
+    except ValueError as error:
+        sys.exit(f"error: {error}")
+    except KeyboardInterrupt:
+        print()
+        print(f"interrupted; run again to resume from {params.checkpoint}")
+        sys.exit(130)
+    print_verification_results(checkpoint)
+    if checkpoint["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
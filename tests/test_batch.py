@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import io
+import itertools
+import json
+
+import pytest
+
+import coinproblem.batch as batch
+import coinproblem.solver as solver
+
+SMALL_COUNTS = tuple(itertools.product(range(8), repeat=4))
+
+
+def get_batch_inputs():
+    """Should build solvable inputs plus a few unsolvable ones."""
+    counts = [sum(counts_list) for counts_list in SMALL_COUNTS]
+    amounts = [
+        sum(c * v for c, v in zip(counts_list, solver.CENT_VALUES)) / 100
+        for counts_list in SMALL_COUNTS
+    ]
+    return counts + [1, 3, 2], amounts + [0.02, 0.04, 0.75]
+
+
+def assert_batch_results(counts, amounts, coin_counts, solvable):
+    """Should verify every solvable row and flag every unsolvable one."""
+    assert len(coin_counts) == len(solvable) == len(counts)
+    for count, amount, row, is_solvable in zip(counts, amounts, coin_counts, solvable):
+        row = [int(coin_count) for coin_count in row]
+        if not is_solvable:
+            assert row == [0, 0, 0, 0]
+            continue
+        assert sum(row) == count
+        assert sum(c * v for c, v in zip(row, solver.CENT_VALUES)) == round(
+            amount * 100
+        )
+        assert all(coin_count >= 0 for coin_count in row)
+    assert list(solvable[-3:]) == [False, False, False]
+    assert all(solvable[:-3])
+
+
+def test_solve_batch_numpy():
+    """Should solve every row with vectorized arithmetic."""
+    pytest.importorskip("numpy")
+    counts, amounts = get_batch_inputs()
+    coin_counts, solvable = batch.solve_batch(counts, amounts)
+    assert coin_counts.shape == (len(counts), 4)
+    assert_batch_results(counts, amounts, coin_counts, solvable)
+
+
+def test_solve_batch_python(monkeypatch):
+    """Should fall back to pure Python when NumPy is unavailable."""
+    monkeypatch.setattr(batch, "numpy", None)
+    counts, amounts = get_batch_inputs()
+    coin_counts, solvable = batch.solve_batch(counts, amounts)
+    assert_batch_results(counts, amounts, coin_counts, solvable)
+
+
+def test_solve_batch_agrees():
+    """Should return the same solutions with and without NumPy."""
+    pytest.importorskip("numpy")
+    counts, amounts = get_batch_inputs()
+    numpy_counts, numpy_solvable = batch.solve_batch_with_numpy(counts, amounts)
+    python_counts, python_solvable = batch.solve_batch_with_python(counts, amounts)
+    assert [tuple(row) for row in numpy_counts.tolist()] == python_counts
+    assert numpy_solvable.tolist() == python_solvable
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 20, 1692])
+def test_feasibility_map(count):
+    """Should map exactly the amounts that the count can make."""
+    pytest.importorskip("numpy")
+    feasible = batch.feasibility_map(count)
+    assert len(feasible) == 25 * count + 1
+    assert feasible.tolist() == [
+        solver.is_solvable(count, cents / 100) for cents in range(25 * count + 1)
+    ]
+
+
+def test_feasibility_map_python(monkeypatch):
+    """Should map the same amounts without NumPy."""
+    pytest.importorskip("numpy")
+    numpy_map = batch.feasibility_map(40, range(10, 1200, 3))
+    monkeypatch.setattr(batch, "numpy", None)
+    python_map = batch.feasibility_map(40, range(10, 1200, 3))
+    assert isinstance(python_map, bytearray)
+    assert list(python_map) == [int(feasible) for feasible in numpy_map]
+
+
+@pytest.mark.parametrize("batch_format", batch.BATCH_FORMATS)
+def test_run_batch(batch_format):
+    """Should solve every row across workers while preserving input order."""
+    counts, amounts = get_batch_inputs()
+    if batch_format == "jsonl":
+        lines = (
+            json.dumps({"count": count, "amount": amount})
+            for count, amount in zip(counts, amounts)
+        )
+    else:
+        lines = (f"{count},{amount}" for count, amount in zip(counts, amounts))
+    output_file = io.StringIO()
+
+    batch.run_batch(
+        io.StringIO("\n".join(lines) + "\n"),
+        output_file,
+        batch_format=batch_format,
+        engine="lattice",
+        workers=2,
+        chunk_size=7,
+    )
+
+    output_lines = output_file.getvalue().splitlines()
+    assert len(output_lines) == len(counts)
+    for line, count, amount in zip(output_lines, counts, amounts):
+        if batch_format == "jsonl":
+            row = json.loads(line)
+            assert (row["count"], row["amount"]) == (count, amount)
+            coin_counts = row["coin_counts"]
+        else:
+            fields = line.split(",")
+            assert (int(fields[0]), float(fields[1])) == (count, amount)
+            coin_counts = (
+                dict(zip(solver.COIN_TYPES, map(int, fields[2:])))
+                if fields[2]
+                else None
+            )
+        assert coin_counts == solver.get_coin_counts(count, amount, "lattice")
+
+
+@pytest.mark.parametrize(
+    "batch_format, input_text, expected_lines",
+    [
+        (
+            "csv",
+            "count,amount\n10,0.64\nten,0.64\n1,inf\n3\n3,0.03\n",
+            ["10,0.64,4,3,2,1", ",,,,,", ",,,,,", ",,,,,", "3,0.03,3,0,0,0"],
+        ),
+        (
+            "jsonl",
+            '{"count":3,"amount":0.03}\nnot-json\n{"count":3}\n[3]\n',
+            [
+                '{"count":3,"amount":0.03,"coin_counts":'
+                '{"pennies":3,"nickels":0,"dimes":0,"quarters":0}}',
+                '{"count":null,"amount":null,"coin_counts":null}',
+                '{"count":null,"amount":null,"coin_counts":null}',
+                '{"count":null,"amount":null,"coin_counts":null}',
+            ],
+        ),
+    ],
+)
+def test_run_batch_malformed(batch_format, input_text, expected_lines, capsys):
+    """Should skip a CSV header, and write malformed rows out as unsolvable."""
+    output_file = io.StringIO()
+
+    batch.run_batch(
+        io.StringIO(input_text),
+        output_file,
+        batch_format=batch_format,
+        engine="lattice",
+        workers=1,
+    )
+
+    assert output_file.getvalue().splitlines() == expected_lines
+    assert capsys.readouterr().err.count("malformed row on line") == 3
+
+
+def test_run_sweep():
+    """Should stream a row for every cent in a sweep, in either direction."""
+    output_file = io.StringIO()
+    batch.run_sweep(output_file, 3, 0.20, 0.15)
+    assert output_file.getvalue().splitlines() == [
+        "3,0.2,0,2,1,0",
+        "3,0.19,,,,",
+        "3,0.18,,,,",
+        "3,0.17,,,,",
+        "3,0.16,1,1,1,0",
+        "3,0.15,0,3,0,0",
+    ]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import sys
+
+import pytest
+
+import coinproblem.bench as bench
+import coinproblem.solver as solver
+
+
+@pytest.mark.parametrize("tier", bench.TIERS)
+def test_tier_inputs(tier):
+    """Should generate solvable inputs of the tier's size."""
+    for count, amount in bench.get_tier_inputs(tier, 10, random.Random(0)):
+        assert count <= bench.TIERS[tier]
+        assert tier == "small" or count == bench.TIERS[tier]
+        assert solver.get_coin_counts(count, amount, "lattice") is not None
+
+
+def test_run_benchmarks():
+    """Should time every engine for every tier and the handpicked cases."""
+    results = bench.run_benchmarks(
+        ["lattice"], input_count=2, repeat=1, cases_path=bench.CASES_PATH
+    )
+    assert list(results) == [f"lattice/{tier}" for tier in (*bench.TIERS, "cases")]
+    assert results["lattice/cases"]["inputs"] == 15
+    for result in results.values():
+        assert 0 < result["median_ns"] <= result["max_ns"]
+
+
+def test_regressions():
+    """Should flag benchmarks whose median or mean slowed beyond the threshold."""
+    baseline = {
+        "fast": {"median_ns": 100, "mean_ns": 100},
+        "steady": {"median_ns": 100, "mean_ns": 100},
+        "tail": {"median_ns": 100, "mean_ns": 100},
+    }
+    results = {
+        "fast": {"median_ns": 130, "mean_ns": 100},
+        "steady": {"median_ns": 120, "mean_ns": 120},
+        "tail": {"median_ns": 100, "mean_ns": 200},
+        "new": {"median_ns": 1_000, "mean_ns": 1_000},
+    }
+    assert bench.get_regressions(results, baseline, 0.25) == ["fast", "tail"]
+
+
+def test_main_baseline(tmp_path, monkeypatch, capsys):
+    """Should save results, and fail against a much faster baseline."""
+    output_path = tmp_path / "bench.json"
+    args = ["bench", "-e", "lattice", "--inputs", "2", "--repeat", "1"]
+    monkeypatch.setattr(sys, "argv", [*args, "-o", str(output_path)])
+    bench.main()
+    saved = json.loads(output_path.read_text())
+    assert set(saved["results"]) >= {"lattice/small", "lattice/65535"}
+
+    for result in saved["results"].values():
+        result["median_ns"] /= 100
+    output_path.write_text(json.dumps(saved))
+    monkeypatch.setattr(sys, "argv", [*args, "--baseline", str(output_path)])
+    with pytest.raises(SystemExit) as exit_info:
+        bench.main()
+    assert exit_info.value.code == 1
+    assert "REGRESSED" in capsys.readouterr().out
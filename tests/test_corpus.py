@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from coinproblem import referee
+from coinproblem.corpus import CorpusError, InputCorpus, generate_corpus
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    """Should generate a small input corpus for each test."""
+    path = tmp_path / "inputs.bin"
+    generate_corpus(path, 1000, 0, 100, seed=42)
+    return path
+
+
+def test_reproducible(corpus_path, tmp_path):
+    """Should generate the same corpus from the same seed."""
+    same_path = tmp_path / "same.bin"
+    generate_corpus(same_path, 1000, 0, 100, seed=42)
+    other_path = tmp_path / "other.bin"
+    generate_corpus(other_path, 1000, 0, 100, seed=43)
+    assert same_path.read_bytes() == corpus_path.read_bytes()
+    assert other_path.read_bytes() != corpus_path.read_bytes()
+
+
+def test_inputs(corpus_path):
+    """Should read back inputs that some number of each coin type can make."""
+    corpus = InputCorpus(corpus_path)
+    assert (len(corpus), corpus.seed, corpus.min_count, corpus.max_count) == (
+        1000,
+        42,
+        0,
+        100,
+    )
+    for index in range(len(corpus)):
+        next_input = corpus.get_input(index)
+        cents = round(next_input["amount"] * 100)
+        assert 0 <= next_input["count"] <= 400
+        assert next_input["count"] <= cents <= 25 * next_input["count"]
+    assert corpus.get_input(1000) == corpus.get_input(0)
+
+
+def test_chunks(tmp_path):
+    """Should generate the same leading inputs for any corpus size."""
+    small_path = tmp_path / "small.bin"
+    generate_corpus(small_path, 10, 5, 10, seed=7)
+    large_path = tmp_path / "large.bin"
+    generate_corpus(large_path, 100_000, 5, 10, seed=7)
+    small_corpus = InputCorpus(small_path)
+    large_corpus = InputCorpus(large_path)
+    assert [small_corpus.get_input(i) for i in range(10)] == [
+        large_corpus.get_input(i) for i in range(10)
+    ]
+
+
+def test_truncated(corpus_path):
+    """Should reject a corpus that is missing inputs."""
+    corpus_path.write_bytes(corpus_path.read_bytes()[:-1])
+    with pytest.raises(CorpusError, match="truncated"):
+        InputCorpus(corpus_path)
+
+
+def test_not_corpus(tmp_path):
+    """Should reject a file that is not an input corpus."""
+    path = tmp_path / "inputs.bin"
+    path.write_bytes(bytes(InputCorpus.HEADER.size))
+    with pytest.raises(CorpusError, match="not an input corpus"):
+        InputCorpus(path)
+
+
+def test_referee_inputs(corpus_path):
+    """Should feed the referee inputs from the corpus, in order."""
+    try:
+        corpus = referee.load_corpus(corpus_path, 1000, 0, 100)
+        first_inputs = [referee.get_next_input(0, 100) for _ in range(5)]
+        referee.reset_inputs()
+        assert [referee.get_next_input(0, 100) for _ in range(5)] == first_inputs
+        assert first_inputs == [corpus.get_input(i) for i in range(5)]
+        assert referee.inputs == []
+    finally:
+        referee.unload_corpus()
+        referee.reset_inputs()
+
+
+def test_referee_generates(tmp_path):
+    """Should generate a missing corpus from the given seed."""
+    path = tmp_path / "inputs.bin"
+    try:
+        corpus = referee.load_corpus(path, 50, 1, 5, seed=9)
+        assert (len(corpus), corpus.seed) == (50, 9)
+    finally:
+        referee.unload_corpus()
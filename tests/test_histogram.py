@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import random
+
+import pytest
+
+from coinproblem.histogram import LatencyHistogram
+
+# The largest relative error of any value reported by the histogram
+PRECISION = 1 / LatencyHistogram.HALF_RANGE
+
+
+def test_exact_values():
+    """Should count small values exactly."""
+    histogram = LatencyHistogram()
+    for value in range(LatencyHistogram.EXACT_RANGE):
+        histogram.record(value)
+    assert histogram.get_percentile(50) == LatencyHistogram.EXACT_RANGE // 2 - 1
+    assert histogram.get_percentile(100) == LatencyHistogram.EXACT_RANGE - 1
+
+
+@pytest.mark.parametrize("value", [64, 65, 127, 128, 1_000, 123_456_789, 2**63])
+def test_bucket_precision(value):
+    """Should place every value in a bucket close to it."""
+    index = LatencyHistogram.get_bucket_index(value)
+    assert index < LatencyHistogram.BUCKET_COUNT
+    bucket_value = LatencyHistogram.get_bucket_value(index)
+    assert abs(bucket_value - value) <= value * PRECISION
+
+
+def test_percentiles():
+    """Should report percentiles within the precision of the buckets."""
+    values = [random.randint(1_000, 10_000_000) for _ in range(10_000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    for percentile in (50, 90, 99):
+        expected = values[len(values) * percentile // 100 - 1]
+        actual = histogram.get_percentile(percentile)
+        assert abs(actual - expected) <= expected * PRECISION
+    assert histogram.get_percentile(100) == histogram.max == values[-1]
+    assert histogram.get_mean() == sum(values) / len(values)
+
+
+def test_merge():
+    """Should combine the values recorded by two histograms."""
+    first = LatencyHistogram()
+    second = LatencyHistogram()
+    for value in range(1, 1001):
+        (first if value % 2 else second).record(value * 1_000)
+    first.merge(second)
+    assert first.count == 1000
+    assert first.max == 1_000_000
+    assert first.total == sum(range(1, 1001)) * 1_000
+    assert abs(first.get_percentile(50) - 500_000) <= 500_000 * PRECISION
+
+
+def test_empty():
+    """Should report zero for a histogram with no values."""
+    histogram = LatencyHistogram()
+    assert histogram.get_percentile(99) == 0
+    assert histogram.get_mean() == 0
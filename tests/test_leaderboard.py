@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from coinproblem import leaderboard
+
+
+@pytest.mark.parametrize(
+    "degrees_of_freedom, critical_value",
+    [(0, 12.706), (1, 12.706), (4.9, 2.776), (30, 2.042), (59, 2.021), (1e6, 1.98)],
+)
+def test_t_critical(degrees_of_freedom, critical_value):
+    """Should look up the critical value, rounding the degrees of freedom down."""
+    assert leaderboard.get_t_critical(degrees_of_freedom) == critical_value
+
+
+def test_confidence_interval():
+    """Should return the mean and the half-width of its 95% interval."""
+    mean, half_width = leaderboard.get_confidence_interval([9, 10, 11])
+    assert mean == 10
+    assert half_width == pytest.approx(4.303 / math.sqrt(3))
+    assert leaderboard.get_confidence_interval([5]) == (5, math.inf)
+
+
+@pytest.mark.parametrize(
+    "samples, other_samples, expected",
+    [
+        ([20, 21, 22], [10, 11, 12], True),
+        ([10, 11, 12], [20, 21, 22], False),
+        ([10, 30, 20], [15, 25, 20], False),
+        ([10, 10], [9, 9], True),
+        ([10], [9, 9], False),
+    ],
+)
+def test_significantly_greater(samples, other_samples, expected):
+    """Should only call a difference in means significant at 95% confidence."""
+    assert leaderboard.is_significantly_greater(samples, other_samples) is expected
+
+
+def build_player(index, throughputs):
+    """Should build a player whose trials had the given throughputs."""
+    return SimpleNamespace(
+        index=index,
+        trials=[{"correct": throughput, "elapsed": 1} for throughput in throughputs],
+        get_success_rate=lambda: 1.0,
+    )
+
+
+def test_rank_players(capsys):
+    """Should share a rank between players that are not significantly apart."""
+    players = [
+        build_player(0, [100, 101, 99]),
+        build_player(1, [200, 210, 190]),
+        build_player(2, [196, 206, 186]),
+        build_player(3, [0, 0, 0]),
+    ]
+
+    ranked_players = leaderboard.rank_players(players)
+
+    assert [(player.index, player.rank) for player in ranked_players] == [
+        (1, 1),
+        (2, 1),
+        (0, 3),
+        (3, 4),
+    ]
+    assert ranked_players[0].throughput == 200
+    leaderboard.print_leaderboard(ranked_players)
+    assert "200.0 ± 24.8" in capsys.readouterr().out
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 
+import asyncio
+import itertools
 import json
+import sys
+import time
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from coinproblem import referee, timer
+from coinproblem import leaderboard, referee, timer
+from coinproblem.histogram import LatencyHistogram
+from coinproblem.player import BACKENDS, InProcessPlayer, PipePlayer, Player, get_player
+
+PLAYER_PATH = Path(__file__).parent.parent / "coinproblem" / "my-player.py"
 
 
 @pytest.fixture(autouse=True)
@@ -49,6 +58,19 @@ def test_total_amount(counts, expected_amount):
     assert referee.get_total_amount(counts) == expected_amount
 
 
+@pytest.mark.parametrize(
+    "counts, expected_cents",
+    [
+        ({"pennies": 0, "nickels": 0, "dimes": 0, "quarters": 0}, 0),
+        ({"pennies": 4, "nickels": 3, "dimes": 2, "quarters": 1}, 64),
+        ({"pennies": 1, "nickels": 2, "dimes": 3, "quarters": 4}, 141),
+    ],
+)
+def test_total_cents(counts, expected_cents):
+    """Should calculate the total value in integer cents."""
+    assert referee.get_total_cents(counts) == expected_cents
+
+
 @patch("coinproblem.referee.random.randint")
 def test_generate_new_input(mock_randint):
     """Should generate consistent count and amount pairs."""
@@ -108,20 +130,6 @@ def test_print_next_input(capsys):
     assert captured.out == "P7: count = 1,234,567, amount = $89.01 "
 
 
-class DummyTimer:
-    def __init__(self, seconds):
-        """Should record the timeout duration."""
-        self.seconds = seconds
-
-    def __enter__(self):
-        """Should allow use as a context manager without side effects."""
-        return None
-
-    def __exit__(self, exc_type, exc, tb):
-        """Should avoid suppressing exceptions."""
-        return False
-
-
 class DummyPlayer:
     def __init__(self, path):
         """Should track player bookkeeping attributes."""
@@ -129,13 +137,18 @@ class DummyPlayer:
         self.total_correct = 0
         self.total_incorrect = 0
         self.total_error = 0
+        self.total_timeout = 0
+        self.latencies = LatencyHistogram()
 
     def get_success_rate(self):
         """Should return a neutral success rate for tests."""
         return 0.0
 
+    def get_rounds_per_second(self):
+        """Should return a neutral throughput for tests."""
+        return 0.0
+
 
-@patch("coinproblem.referee.timer.Timer", DummyTimer)
 @patch("coinproblem.referee.run_rounds_for_player")
 @patch("coinproblem.referee.reset_inputs")
 def test_run_duel(mock_reset, mock_run_rounds, capsys):
@@ -157,6 +170,7 @@ def test_run_duel(mock_reset, mock_run_rounds, capsys):
         call(players[0], 1, 5),
         call(players[1], 1, 5),
     ]
+    assert all(player.timeout == 9 for player in players)
     assert "P0: player-one" in output
     assert "P1: player-two" in output
     assert "min count per coin type: 1" in output
@@ -189,12 +203,20 @@ class FakePlayer:
         self.total_correct = 0
         self.total_incorrect = 0
         self.total_error = 0
+        self.total_timeout = 0
         self.index = 0
+        self.latencies = LatencyHistogram()
+        self.timeout = None
+        self.round_timeout = None
+        self.warmup = 0
 
     def start_program(self):
         """Should attach the provided program to the player."""
         self.program = self._program
 
+    def stop_program(self):
+        """Should leave the mocked program for the next start."""
+
 
 @patch("coinproblem.referee.get_next_input")
 def test_run_rounds_records_correct(get_next_input):
@@ -215,6 +237,8 @@ def test_run_rounds_records_correct(get_next_input):
     assert player.total_incorrect == 0
     assert player.total_error == 0
     assert player.program.sendline.call_args_list[0] == call("3,0.03")
+    assert player.latencies.count == 1
+    assert player.elapsed > 0
 
 
 @patch("coinproblem.referee.get_next_input")
@@ -253,3 +277,511 @@ def test_run_rounds_records_error(get_next_input):
     assert player.total_correct == 0
     assert player.total_incorrect == 0
     assert player.total_error == 1
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_run_rounds_unscored_latency(get_next_input):
+    """Should not record the latency of an answer that can't be scored."""
+    program = build_fake_program(["null"], timer.TimeoutError("timer"))
+    player = FakePlayer(program)
+
+    get_next_input.side_effect = [
+        {"count": 1, "amount": 0.01},
+        {"count": 1, "amount": 0.01},
+    ]
+
+    referee.run_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_error == 1
+    assert player.latencies.count == 0
+
+
+@patch("coinproblem.player.Player.stop_program")
+@patch("coinproblem.referee.run_rounds_for_player")
+def test_player_trial_inputs(mock_run_rounds, mock_stop_program):
+    """Should generate the same inputs for every player given the same seed."""
+    received_inputs = []
+
+    def record_inputs(player, min_count, max_count):
+        """Should record the inputs a player would receive."""
+        received_inputs.append(
+            [referee.get_next_input(min_count, max_count) for _ in range(5)]
+        )
+        player.total_correct = 5
+
+    mock_run_rounds.side_effect = record_inputs
+
+    results = [
+        referee.run_player_trial("player-one", 0, 0, 100, 1, seed=42),
+        referee.run_player_trial("player-two", 1, 0, 100, 1, seed=42),
+        referee.run_player_trial("player-one", 0, 0, 100, 1, seed=43),
+    ]
+
+    assert received_inputs[0] == received_inputs[1]
+    assert received_inputs[0] != received_inputs[2]
+    assert results[0]["correct"] == 5
+    assert results[0]["incorrect"] == 0
+    assert results[0]["error"] == 0
+    assert mock_stop_program.call_count == 3
+
+
+def test_run_tournament(capsys):
+    """Should run real players concurrently and aggregate their trials."""
+    player_path = f"{sys.executable} {PLAYER_PATH}"
+    players = [Player(player_path), Player(f"{player_path} --engine lattice")]
+
+    result = referee.run_tournament(
+        players, min_count=0, max_count=10, timeout=1, workers=4, trials=2
+    )
+
+    output = capsys.readouterr().out
+    assert result == players
+    for player in players:
+        assert len(player.trials) == 2
+        assert player.total_correct > 0
+        assert player.total_incorrect == 0
+        assert player.total_error == 0
+        assert player.latencies.count == player.total_correct
+        assert player.get_rounds_per_second() > 0
+    assert "P0             2" in output
+    assert "P1             2" in output
+
+
+def build_fake_windowed_program(frames, final_exception, terminator="\r\n"):
+    """Should emulate a child program that answers with NUL-prefixed frames."""
+    program = MagicMock()
+    program.isalive.return_value = True
+    program.buffer = ""
+
+    def next_frame(*_):
+        """Should raise once every frame has been read."""
+        if not frames:
+            raise final_exception
+        return "\0" + frames.pop(0) + terminator
+
+    program.read_nonblocking.side_effect = next_frame
+    return program
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_windowed_rounds(get_next_input):
+    """Should send whole windows of inputs once the player accepts them."""
+    answer = json.dumps({"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0})
+    program = build_fake_windowed_program(
+        [json.dumps({"window": 3})] + [answer] * 4, timer.TimeoutError("timer")
+    )
+    player = FakePlayer(program)
+    player.window = 8
+    get_next_input.return_value = {"count": 3, "amount": 0.03}
+
+    referee.run_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 4
+    assert program.send.call_args_list == [
+        call("3,0.03\n"),
+        call("3,0.03\n" * 3),
+        call("3,0.03\n" * 3),
+    ]
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_windowed_rounds_without_newlines(get_next_input):
+    """Should frame answers that arrive together without trailing newlines."""
+    answer = json.dumps({"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0})
+    program = build_fake_windowed_program(
+        [json.dumps({"window": 3})] + [answer] * 4,
+        timer.TimeoutError("timer"),
+        terminator="",
+    )
+    player = FakePlayer(program)
+    player.window = 8
+    get_next_input.return_value = {"count": 3, "amount": 0.03}
+
+    referee.run_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 4
+    assert player.total_error == 0
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_windowed_rounds_error(get_next_input):
+    """Should restart a player whose answer fails partway through a window."""
+    answer = json.dumps({"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0})
+    program = build_fake_windowed_program(
+        [json.dumps({"window": 3}), answer, "oops", answer, answer],
+        timer.TimeoutError("timer"),
+    )
+    player = FakePlayer(program)
+    player.window = 8
+    get_next_input.return_value = {"count": 3, "amount": 0.03}
+
+    referee.run_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 3
+    assert player.total_error == 1
+    assert program.send.call_args_list == [
+        call("3,0.03\n"),
+        call("3,0.03\n" * 3),
+        call("3,0.03\n"),
+        call("3,0.03\n"),
+        call("3,0.03\n"),
+    ]
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_windowed_rounds_lockstep(get_next_input):
+    """Should fall back to lockstep for players that ignore the window."""
+    answer = json.dumps({"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0})
+    program = build_fake_windowed_program([answer] * 3, timer.TimeoutError("timer"))
+    player = FakePlayer(program)
+    player.window = 8
+    get_next_input.return_value = {"count": 3, "amount": 0.03}
+
+    referee.run_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 3
+    assert program.send.call_args_list == [call("3,0.03\n")] * 4
+
+
+@pytest.mark.parametrize("window", [1, 32])
+def test_windowed_player(window, capsys):
+    """Should score a real player whether or not it is offered a window."""
+    player = Player(f"{sys.executable} {PLAYER_PATH} --engine lattice")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1, window=window)
+
+    assert player.total_correct > 0
+    assert player.total_incorrect == 0
+    assert player.total_error == 0
+    assert player.latencies.count == player.total_correct
+
+
+def test_program_latency(capsys):
+    """Should not time a fixed delay before each send as part of a round."""
+    player = Player(f"{sys.executable} {PLAYER_PATH} --engine lattice")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1)
+
+    assert player.total_correct > 0
+    assert player.latencies.get_percentile(50) < 50e6
+
+
+def test_write_report(tmp_path, capsys):
+    """Should write each player's throughput and latencies as JSON."""
+    player = Player(f"{sys.executable} {PLAYER_PATH} --engine lattice")
+    report_path = tmp_path / "report.json"
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1)
+    referee.write_report([player], report_path)
+
+    assert "rounds/s" in capsys.readouterr().out
+    (result,) = json.loads(report_path.read_text())["players"]
+    assert result["correct"] == player.total_correct
+    assert result["rounds_per_second"] > 0
+    latency = result["latency_ms"]
+    assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+
+
+@pytest.mark.parametrize(
+    "path, player_class",
+    [
+        ("coinproblem.solver:get_coin_counts", InProcessPlayer),
+        ("my_solver:solve", InProcessPlayer),
+        ("./coinproblem/my-player.py", Player),
+        ("python3 my-player.py --engine lattice", Player),
+    ],
+)
+def test_get_player(path, player_class):
+    """Should call module:function specs in-process and spawn anything else."""
+    assert type(get_player(path)) is player_class
+
+
+def test_in_process_player(capsys):
+    """Should score a player function called directly by the referee."""
+    player = get_player("coinproblem.solver:get_coin_counts")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1)
+
+    assert player.total_correct > 0
+    assert player.total_incorrect == 0
+    assert player.total_error == 0
+    assert player.latencies.count == player.total_correct
+    assert "✓" not in capsys.readouterr().out
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_in_process_rounds_verify(get_next_input):
+    """Should verify in-process answers just like program answers."""
+    answers = [
+        {"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0},
+        {"pennies": 2, "nickels": 0, "dimes": 0, "quarters": 0},
+        None,
+    ]
+    player = InProcessPlayer("coinproblem.solver:get_coin_counts")
+    player.index = 0
+    player.function = lambda count, amount: answers.pop(0)
+    get_next_input.side_effect = [{"count": 3, "amount": 0.03}] * 3 + [
+        timer.TimeoutError("timer")
+    ]
+
+    referee.run_in_process_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 1
+    assert player.total_incorrect == 1
+    assert player.total_error == 1
+    assert player.latencies.count == 2
+
+
+def test_in_process_tournament(capsys):
+    """Should run in-process players in worker processes."""
+    players = [get_player("coinproblem.solver:get_coin_counts")]
+
+    referee.run_tournament(
+        players, min_count=0, max_count=10, timeout=1, workers=2, trials=2
+    )
+
+    assert players[0].total_correct > 0
+    assert players[0].total_incorrect == 0
+
+
+def test_deadline():
+    """Should expire a deadline no later than its parent."""
+    assert not timer.Deadline().has_expired()
+    assert timer.Deadline().get_remaining() is None
+    parent = timer.Deadline(0)
+    assert parent.has_expired()
+    assert timer.Deadline(60, parent).has_expired()
+    assert 0 < timer.Deadline(60).get_remaining() <= 60
+    with pytest.raises(timer.TimeoutError):
+        timer.Deadline(0).check()
+
+
+def test_duel_timeout(capsys):
+    """Should end each player's rounds once its sub-second timeout expires."""
+    player = get_player("coinproblem.solver:get_coin_counts")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=0.05)
+
+    assert player.elapsed < 0.5
+    assert player.total_correct > 0
+    assert "timeout per player: 0.05 s" in capsys.readouterr().out
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_in_process_round_timeout(get_next_input, capsys):
+    """Should score in-process rounds slower than the round timeout as timeouts."""
+    delays = [0, 0.01, 0]
+    player = InProcessPlayer("coinproblem.solver:get_coin_counts")
+    player.index = 0
+    player.round_timeout = 0.005
+
+    def solve(count, amount):
+        """Should answer correctly after the next delay."""
+        time.sleep(delays.pop(0))
+        return {"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0}
+
+    player.function = solve
+    get_next_input.side_effect = [{"count": 3, "amount": 0.03}] * 3 + [
+        timer.TimeoutError("timer")
+    ]
+
+    referee.run_in_process_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 2
+    assert player.total_timeout == 1
+    assert player.latencies.count == 2
+
+
+# A player program that answers (wrongly) straight away, but then takes a tenth
+# of a second to read its next input
+SLOW_PLAYER_PATH = (
+    f"{sys.executable} -c "
+    "'import sys, time; "
+    '[print("\\0{}", flush=True) or time.sleep(0.1) for _ in sys.stdin]\''
+)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_program_round_timeout(backend, capsys):
+    """Should time out (and restart) a program that misses the round timeout."""
+    player = get_player(SLOW_PLAYER_PATH, backend)
+
+    referee.run_duel(
+        [player], min_count=0, max_count=10, timeout=0.5, round_timeout=0.01
+    )
+
+    assert player.total_timeout > 1
+    assert player.total_incorrect > 1
+    assert player.total_correct == 0
+    assert "timeout per round: 10 ms" in capsys.readouterr().out
+
+
+# A player program that accepts a window of four inputs, and answers every
+# input with the right number of pennies, except for the last input of its
+# first window (which it answers with null) and an input in the middle of its
+# second window (which it answers with invalid JSON)
+ERROR_PLAYER_SOURCE = """
+import json, os, sys
+if os.environ.get("COIN_PROBLEM_WINDOW"):
+    print("\\0" + json.dumps({"window": 4}), flush=True)
+for line_number, line in enumerate(sys.stdin):
+    count = int(line.split(",")[0])
+    if line_number in (4, 6):
+        print("\\0null" if line_number == 4 else "\\0oops", flush=True)
+        continue
+    answer = {"pennies": count, "nickels": 0, "dimes": 0, "quarters": 0}
+    print("\\0" + json.dumps(answer), flush=True)
+"""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_program_window_error(backend, tmp_path, capsys):
+    """Should not score a window's leftover answers against later rounds."""
+    player_path = tmp_path / "error-player.py"
+    player_path.write_text(ERROR_PLAYER_SOURCE)
+    player = get_player(f"{sys.executable} {player_path}", backend)
+    rounds = itertools.count(1)
+
+    def get_pennies_input(*_):
+        """Should return an input that takes as many pennies as its count."""
+        count = next(rounds) % 7 + 1
+        return {"count": count, "amount": count / 100}
+
+    with (
+        patch("coinproblem.referee.get_input", get_pennies_input),
+        patch("coinproblem.referee.get_next_input", get_pennies_input),
+    ):
+        referee.run_duel([player], min_count=0, max_count=10, timeout=0.5, window=8)
+
+    assert player.total_error > 1
+    assert player.total_correct > 1
+    assert player.total_incorrect == 0
+    assert player.latencies.count == player.total_correct
+
+
+@pytest.mark.parametrize(
+    "correct, incorrect, error, timeout, expected",
+    [(0, 0, 0, 0, 0), (3, 1, 0, 0, 0.75), (1, 0, 1, 2, 0.25), (2, 2, 0, 0, 0.5)],
+)
+def test_success_rate(correct, incorrect, error, timeout, expected):
+    """Should count every unsuccessful round against the player."""
+    player = Player("player")
+    player.total_correct = correct
+    player.total_incorrect = incorrect
+    player.total_error = error
+    player.total_timeout = timeout
+
+    assert player.get_success_rate() == expected
+
+
+@patch("coinproblem.referee.get_next_input")
+def test_warmup_rounds(get_next_input):
+    """Should discard the results of the warm-up rounds."""
+    answers = [
+        {"pennies": 2, "nickels": 0, "dimes": 0, "quarters": 0},
+        None,
+        {"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0},
+        {"pennies": 3, "nickels": 0, "dimes": 0, "quarters": 0},
+    ]
+    player = InProcessPlayer("coinproblem.solver:get_coin_counts")
+    player.index = 0
+    player.warmup = 2
+    player.function = lambda count, amount: answers.pop(0)
+    get_next_input.side_effect = [{"count": 3, "amount": 0.03}] * 4 + [
+        timer.TimeoutError("timer")
+    ]
+
+    referee.run_in_process_rounds_for_player(player, min_count=0, max_count=1)
+
+    assert player.total_correct == 2
+    assert player.total_incorrect == 0
+    assert player.total_error == 0
+    assert player.latencies.count == 2
+    assert player.warmup == 0
+
+
+def test_leaderboard_report(tmp_path, capsys):
+    """Should rank players across trials and report their rank."""
+    players = [get_player("coinproblem.solver:get_coin_counts")]
+    report_path = tmp_path / "report.json"
+
+    referee.run_tournament(
+        players, min_count=0, max_count=10, timeout=0.2, trials=2, warmup=100
+    )
+    ranked_players = leaderboard.rank_players(players)
+    referee.write_report(ranked_players, report_path)
+
+    assert "warm-up rounds per player: 100" in capsys.readouterr().out
+    (result,) = json.loads(report_path.read_text())["players"]
+    assert result["rank"] == 1
+    assert len(result["correct_per_second"]["trials"]) == 2
+    assert result["correct_per_second"]["mean"] > 0
+
+
+@pytest.mark.parametrize("window", [1, 32])
+def test_pipe_player(window, capsys):
+    """Should score a real player through pipes, with or without a window."""
+    player = get_player(f"{sys.executable} {PLAYER_PATH} --engine lattice", "pipe")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1, window=window)
+
+    assert type(player) is PipePlayer
+    assert player.total_correct > 0
+    assert player.total_incorrect == 0
+    assert player.total_error == 0
+    assert player.latencies.count == player.total_correct
+    assert "✓" not in capsys.readouterr().out
+
+
+def test_pipe_framing():
+    """Should frame answers by their NUL, whether or not a newline follows."""
+    player = PipePlayer("cat")
+
+    async def echo_answers():
+        """Should read back every answer that cat echoes."""
+        await player.start_process()
+        try:
+            await player.send('junk\0{"a":1}\n\0{"b":2}\0{"c":')
+            answers = [await player.read_answer(), await player.read_answer()]
+            await player.send("3}")
+            answers.append(await player.read_answer())
+            await player.send("\0not-json\n")
+            with pytest.raises(ValueError):
+                await player.read_answer()
+            await player.send('\0{"d":4}\n')
+            answers.append(await player.read_answer())
+            return answers
+        finally:
+            await player.stop_process()
+
+    assert asyncio.run(echo_answers()) == [{"a": 1}, {"b": 2}, {"c": 3}, {"d": 4}]
+
+
+def test_pipe_player_exit(capsys):
+    """Should stop playing a pipe player whose program has exited."""
+    player = get_player("true", "pipe")
+
+    referee.run_duel([player], min_count=0, max_count=10, timeout=1)
+
+    assert player.elapsed < 1
+    assert "P0 no longer alive" in capsys.readouterr().out
+
+
+def test_pipe_tournament(capsys):
+    """Should drive pipe players from worker processes in a tournament."""
+    players = [get_player(f"{sys.executable} {PLAYER_PATH}", "pipe")]
+
+    referee.run_tournament(
+        players, min_count=0, max_count=10, timeout=0.5, trials=2, backend="pipe"
+    )
+
+    assert players[0].total_correct > 0
+    assert players[0].total_incorrect == 0
+
+
+def test_get_input():
+    """Should give players that keep their own index the same inputs."""
+    first = referee.get_input(2, min_count=0, max_count=10)
+    assert len(referee.inputs) == 3
+    assert referee.get_input(2, min_count=0, max_count=10) is first
+    assert referee.get_next_input(min_count=0, max_count=10) is referee.inputs[0]
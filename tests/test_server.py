@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import time
+
+import coinproblem.server as server
+import coinproblem.solver as solver
+
+REQUESTS = [(1692, 100.54), (3, 0.04), (6, 0.56), (0, 0.0)]
+
+
+async def send_requests(reader, writer, requests):
+    """Should pipeline every request before reading any answers."""
+    writer.write("".join(f"{count},{amount}\n" for count, amount in requests).encode())
+    await writer.drain()
+    answers = []
+    for _ in requests:
+        line = await reader.readline()
+        assert line.startswith(b"\0")
+        answers.append(json.loads(line[1:]))
+    return answers
+
+
+def assert_answers(answers, requests, engine=solver.DEFAULT_ENGINE):
+    """Should answer every request in order, as a player would."""
+    assert answers == [
+        solver.get_coin_counts(count, amount, engine) for count, amount in requests
+    ]
+
+
+def test_unix_socket(tmp_path):
+    """Should answer pipelined requests over a Unix domain socket."""
+    socket_path = str(tmp_path / "solver.sock")
+
+    async def run():
+        """Should run a server and a client on one event loop."""
+        async with await server.start_server(socket_path=socket_path):
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            answers = await send_requests(reader, writer, REQUESTS)
+            writer.close()
+        return answers
+
+    assert_answers(asyncio.run(run()), REQUESTS)
+
+
+def test_concurrent_clients():
+    """Should serve many concurrent TCP clients from one process."""
+
+    async def run_client(port, requests):
+        """Should send one client's requests in several pipelined batches."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        answers = []
+        for start in range(0, len(requests), 7):
+            answers += await send_requests(reader, writer, requests[start : start + 7])
+        writer.close()
+        return answers
+
+    client_requests = [
+        [(count, round(count * 0.05 + client * 0.01, 2)) for count in range(20)]
+        for client in range(30)
+    ]
+
+    async def run():
+        """Should run a server and every client on one event loop."""
+        tcp_server = await server.start_server(port=0, engine="lattice")
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            return await asyncio.gather(
+                *(run_client(port, requests) for requests in client_requests)
+            )
+
+    for answers, requests in zip(asyncio.run(run()), client_requests):
+        assert_answers(answers, requests, engine="lattice")
+
+
+def test_malformed_request():
+    """Should answer malformed requests with an empty object."""
+    assert server.answer_request(b"not,a,request", "lattice") == "\0{}\n"
+    assert server.answer_request(b"1,inf", "lattice") == "\0{}\n"
+    assert server.answer_request(b"1,1e400", "lattice") == "\0{}\n"
+    assert server.answer_request(b"3,0.04", "lattice") == "\0null\n"
+
+
+def test_malformed_request_in_batch(tmp_path):
+    """Should answer the rest of a pipelined batch after a malformed request."""
+    socket_path = str(tmp_path / "solver.sock")
+
+    async def run():
+        """Should run a server and a client on one event loop."""
+        async with await server.start_server(socket_path=socket_path):
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(b"10,0.64\n1,inf\n3,0.03\n")
+            await writer.drain()
+            answers = [await reader.readline() for _ in range(3)]
+            writer.close()
+        return answers
+
+    answers = asyncio.run(run())
+    assert answers[1] == b"\0{}\n"
+    assert json.loads(answers[0][1:]) == solver.get_coin_counts(10, 0.64)
+    assert json.loads(answers[2][1:]) == solver.get_coin_counts(3, 0.03)
+
+
+def test_answer_requests_batch():
+    """Should answer a batch of requests just as it answers each one alone."""
+    lines = [
+        f"{count},{cents / 100}".encode()
+        for count in range(12)
+        for cents in range(-1, 25 * count + 2)
+    ] + [b"not,a,request", b"1,inf", b"3,nan", b"10000000000000000000000,1"]
+    for engine in ("lattice", "auto", "heuristic"):
+        assert server.answer_requests(lines, engine) == "".join(
+            server.answer_request(line, engine) for line in lines
+        )
+
+
+def test_slow_batch(monkeypatch):
+    """Should keep answering other clients while one client's batch is solved."""
+    get_coin_counts = solver.get_coin_counts
+
+    def get_slow_coin_counts(count, amount, engine):
+        """Should take a while to solve any problem with a single coin."""
+        if count == 1:
+            time.sleep(0.5)
+        return get_coin_counts(count, amount, engine)
+
+    monkeypatch.setattr(solver, "get_coin_counts", get_slow_coin_counts)
+
+    async def run_client(port, requests):
+        """Should return the client's answers once they have all arrived."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        answers = await send_requests(reader, writer, requests)
+        writer.close()
+        return answers
+
+    async def run():
+        """Should start the fast client just after the slow one."""
+        tcp_server = await server.start_server(port=0, engine="heuristic")
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            start_time = time.perf_counter()
+            slow_client = asyncio.ensure_future(run_client(port, [(1, 0.01)]))
+            await asyncio.sleep(0.05)
+            fast_answers = await run_client(port, REQUESTS)
+            fast_elapsed = time.perf_counter() - start_time
+            return await slow_client, fast_answers, fast_elapsed
+
+    slow_answers, fast_answers, fast_elapsed = asyncio.run(run())
+    assert slow_answers == [{"pennies": 1, "nickels": 0, "dimes": 0, "quarters": 0}]
+    assert_answers(fast_answers, REQUESTS, engine="heuristic")
+    assert fast_elapsed < 0.4
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
+import collections
 import itertools
 import json
+import operator
 from collections import namedtuple
 from pathlib import Path
 
@@ -42,13 +44,13 @@ def get_current_amount(coin_counts):
     )
 
 
-def assert_single_test_case(counts_list):
+def assert_single_test_case(counts_list, engine="heuristic"):
     total_count = sum(counts_list)
     total_amount = round(
         sum(count * amount for count, amount in zip(counts_list, AMOUNTS_LIST)), 2
     )
     counts = solver.get_coin_counts(
-        total_coin_count=total_count, total_coin_amount=total_amount
+        total_coin_count=total_count, total_coin_amount=total_amount, engine=engine
     )
     current_count = get_current_count(counts)
     current_amount = get_current_amount(counts)
@@ -87,3 +89,455 @@ def test_handpicked(pennies, nickels, dimes, quarters):
 )
 def test_permutations(pennies, nickels, dimes, quarters):
     assert_single_test_case((pennies, nickels, dimes, quarters))
+
+
+@pytest.mark.parametrize(
+    COUNT_FIELD_NAMES,
+    HANDPICKED_COUNTS,
+)
+def test_handpicked_lattice(pennies, nickels, dimes, quarters):
+    assert_single_test_case((pennies, nickels, dimes, quarters), engine="lattice")
+
+
+@pytest.mark.parametrize(
+    COUNT_FIELD_NAMES,
+    tuple(itertools.product(range(0, 65_536, 13_107), repeat=4)),
+)
+def test_large_lattice(pennies, nickels, dimes, quarters):
+    assert_single_test_case((pennies, nickels, dimes, quarters), engine="lattice")
+
+
+@pytest.mark.parametrize(
+    COUNT_FIELD_NAMES,
+    tuple(itertools.product(range(0, 8, 3), repeat=4)),
+)
+def test_small_exhaustive(pennies, nickels, dimes, quarters):
+    assert_single_test_case((pennies, nickels, dimes, quarters), engine="exhaustive")
+
+
+@pytest.mark.parametrize(
+    COUNT_FIELD_NAMES,
+    HANDPICKED_COUNTS,
+)
+def test_handpicked_auto(pennies, nickels, dimes, quarters):
+    assert_single_test_case((pennies, nickels, dimes, quarters), engine="auto")
+
+
+def test_choose_engine():
+    """Should dispatch to the lattice engine when no answer table is loaded."""
+    assert solver.choose_engine(65_535, 2345.67) == "lattice"
+    assert solver.choose_engine(3, 0.04) == "lattice"
+    assert solver.get_coin_counts(3, 0.04) is None
+
+
+def test_register_engine(monkeypatch):
+    """Should make a registered engine available by name."""
+    monkeypatch.setattr(solver, "ENGINES", dict(solver.ENGINES))
+    solver.register_engine("lattice-copy", solver.solve_with_lattice)
+    assert solver.get_coin_counts(10, 0.64, engine="lattice-copy") == (
+        solver.get_coin_counts(10, 0.64, engine="lattice")
+    )
+
+
+def test_lattice_feasibility():
+    """Should find a solution exactly when one exists."""
+    feasible = {
+        (sum(counts), sum(c * v for c, v in zip(counts, solver.CENT_VALUES)))
+        for counts in itertools.product(range(21), repeat=4)
+        if sum(counts) <= 20
+    }
+    for count in range(21):
+        for cents in range(25 * 20 + 2):
+            counts = solver.get_coin_counts(count, cents / 100, engine="lattice")
+            assert (counts is not None) == ((count, cents) in feasible)
+
+
+@pytest.mark.parametrize(
+    COUNT_FIELD_NAMES,
+    HANDPICKED_COUNTS,
+)
+def test_brute_force(pennies, nickels, dimes, quarters):
+    """Should find a valid combination by exhaustive search."""
+    counts_list = (pennies, nickels, dimes, quarters)
+    total_count = sum(counts_list)
+    total_cents = sum(c * v for c, v in zip(counts_list, solver.CENT_VALUES))
+    counts = solver.brute_force(total_count, total_cents / 100)
+    assert counts.count == total_count
+    assert counts.cents == total_cents
+    assert all(count >= 0 for count in counts)
+
+
+@pytest.mark.parametrize("count, amount", [(1, 0.02), (3, 0.04), (2, 0.75)])
+def test_brute_force_no_solution(count, amount):
+    """Should return None when no combination exists."""
+    assert solver.brute_force(count, amount) is None
+    assert solver.get_coin_counts(count, amount) is None
+
+
+def test_is_solvable():
+    """Should decide solvability exactly as an exhaustive search would."""
+    feasible = {
+        (sum(counts), sum(c * v for c, v in zip(counts, solver.CENT_VALUES)))
+        for counts in itertools.product(range(21), repeat=4)
+        if sum(counts) <= 20
+    }
+    for count in range(21):
+        for cents in range(25 * 20 + 2):
+            assert solver.is_solvable(count, cents / 100) == (
+                (count, cents) in feasible
+            )
+
+
+def test_unsolvable_skips_search():
+    """Should reject unsolvable inputs without searching for a solution."""
+    solver.enable_stats()
+    try:
+        assert solver.get_coin_counts(65_535, 16_383.74) is None
+        assert "brute_force_splits" not in solver.get_stats()["counters"]
+    finally:
+        solver.disable_stats()
+
+
+def get_small_solutions(max_count):
+    """Should map each (count, cents) pair to its coin counts by enumeration."""
+    solutions = collections.defaultdict(set)
+    for counts in itertools.product(range(max_count + 1), repeat=4):
+        if sum(counts) <= max_count:
+            total_cents = sum(c * v for c, v in zip(counts, solver.CENT_VALUES))
+            solutions[sum(counts), total_cents].add(counts)
+    return solutions
+
+
+def test_iter_coin_counts():
+    """Should lazily yield every solution exactly once."""
+    solutions = get_small_solutions(16)
+    for count in range(17):
+        for cents in range(25 * count + 2):
+            yielded = [
+                tuple(counts) for counts in solver.iter_coin_counts(count, cents / 100)
+            ]
+            assert len(yielded) == len(set(yielded))
+            assert set(yielded) == solutions[count, cents]
+
+
+def test_count_solutions():
+    """Should count the solutions without enumerating them."""
+    solutions = get_small_solutions(16)
+    for count in range(17):
+        for cents in range(25 * count + 2):
+            assert solver.count_solutions(count, cents / 100) == len(
+                solutions[count, cents]
+            )
+
+
+@pytest.mark.parametrize("count, amount", [(1692, 100.54), (500, 37.5)])
+def test_count_solutions_large(count, amount):
+    """Should agree with the full enumeration for larger inputs."""
+    assert solver.count_solutions(count, amount) == sum(
+        1 for _ in solver.iter_coin_counts(count, amount)
+    )
+
+
+@pytest.fixture
+def solver_cache():
+    """Should enable a small cache for the duration of a test."""
+    try:
+        yield solver.enable_cache(maxsize=2)
+    finally:
+        solver.disable_cache()
+
+
+def test_cache_hits(solver_cache):
+    """Should serve repeated inputs from the cache, keyed by cents."""
+    first = solver.get_coin_counts(6, 0.3)
+    second = solver.get_coin_counts(6, 0.1 + 0.2)
+    assert first == second
+    assert solver.get_cache_stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "size": 1,
+        "maxsize": 2,
+    }
+
+
+def test_cache_eviction(solver_cache):
+    """Should evict the least recently used entry once full."""
+    solver.get_coin_counts(1, 0.01)
+    solver.get_coin_counts(1, 0.05)
+    solver.get_coin_counts(1, 0.01)
+    solver.get_coin_counts(1, 0.10)
+    solver.get_coin_counts(1, 0.01)
+    solver.get_coin_counts(1, 0.05)
+    stats = solver.get_cache_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["evictions"] == 2
+    assert stats["size"] == 2
+
+
+def test_cache_copies(solver_cache):
+    """Should not let callers that mutate results poison the cache."""
+    coin_counts = solver.get_coin_counts(4, 0.55)
+    expected = dict(coin_counts)
+    coin_counts["pennies"] = -100
+    assert solver.get_coin_counts(4, 0.55) == expected
+    assert solver.get_coin_counts(3, 0.04) is None
+    assert solver.get_coin_counts(3, 0.04) is None
+    assert solver.get_cache_stats()["hits"] == 2
+
+
+def test_cache_disabled():
+    """Should not report stats when the cache is disabled."""
+    assert solver.get_cache_stats() is None
+
+
+@pytest.mark.parametrize(
+    "objective",
+    [
+        "min:pennies",
+        "max:pennies",
+        "min:nickels",
+        "max:nickels",
+        "min:dimes",
+        "max:dimes",
+        "min:quarters",
+        "max:quarters",
+        {"pennies": 3, "nickels": -2, "dimes": 1, "quarters": -4},
+        {"nickels": 1, "dimes": 1},
+    ],
+)
+def test_objective(objective):
+    """Should find a solution as good as the best of every solution."""
+    weights = solver.parse_objective(objective)
+    for count in range(0, 41, 3):
+        for cents in range(count, 25 * count + 1, 7):
+            solutions = list(solver.iter_coin_counts(count, cents / 100))
+            coin_counts = solver.get_coin_counts(
+                count, cents / 100, objective=objective
+            )
+            if not solutions:
+                assert coin_counts is None
+                continue
+            assert solver.get_current_count(coin_counts) == count
+            assert round(solver.get_current_amount(coin_counts) * 100) == cents
+            assert sum(map(operator.mul, weights, coin_counts.values())) == min(
+                sum(map(operator.mul, weights, s)) for s in solutions
+            )
+
+
+def test_objective_large():
+    """Should optimize at the largest counts in constant time."""
+    coin_counts = solver.get_coin_counts(65_535, 6_553.5, objective="max:quarters")
+    # 24,575 quarters would leave 15 cents for 4n + 9d, which cannot be made
+    assert coin_counts == {
+        "pennies": 40_955,
+        "nickels": 3,
+        "dimes": 3,
+        "quarters": 24_574,
+    }
+
+
+@pytest.mark.parametrize("objective", ["fewest:pennies", "min:euros", {"half": 1}])
+def test_objective_invalid(objective):
+    """Should reject malformed objectives."""
+    with pytest.raises(ValueError):
+        solver.parse_objective(objective)
+
+
+def test_resolve_coin_counts():
+    """Should re-solve nearby problems from a previous solution."""
+    for count in range(0, 41, 3):
+        for cents in range(count, 25 * count + 1, 11):
+            previous = solver.get_coin_counts(count, cents / 100, engine="lattice")
+            if previous is None:
+                continue
+            for new_count in range(max(0, count - 2), count + 3):
+                for new_cents in range(cents - 12, cents + 13):
+                    coin_counts = solver.resolve_coin_counts(
+                        previous, new_count, new_cents / 100
+                    )
+                    if not solver.is_solvable(new_count, new_cents / 100):
+                        assert coin_counts is None
+                        continue
+                    assert solver.get_current_count(coin_counts) == new_count
+                    assert round(solver.get_current_amount(coin_counts) * 100) == (
+                        new_cents
+                    )
+                    assert min(coin_counts.values()) >= 0
+
+
+def test_resolve_is_local():
+    """Should reach the next cent with a handful of substitutions."""
+    previous = {"pennies": 4, "nickels": 1366, "dimes": 322, "quarters": 0}
+    assert solver.resolve_coin_counts(previous, 1692, 100.55) == {
+        "pennies": 5,
+        "nickels": 1364,
+        "dimes": 323,
+        "quarters": 0,
+    }
+    assert solver.resolve_coin_counts(previous, 1692, 100.53) == {
+        "pennies": 3,
+        "nickels": 1368,
+        "dimes": 321,
+        "quarters": 0,
+    }
+
+
+def test_sweep_coin_counts():
+    """Should solve every amount in a sweep, or report it as unsolvable."""
+    amounts = [cents / 100 for cents in range(25 * 20 + 2)]
+    for amount, coin_counts in solver.sweep_coin_counts(20, amounts):
+        if not solver.is_solvable(20, amount):
+            assert coin_counts is None
+            continue
+        assert solver.get_current_count(coin_counts) == 20
+        assert solver.get_current_amount(coin_counts) == amount
+
+
+@pytest.fixture
+def solver_stats():
+    """Should enable solver stats for the duration of a test."""
+    try:
+        yield solver.enable_stats()
+    finally:
+        solver.disable_stats()
+
+
+def test_stats_paths(solver_stats):
+    """Should count the path taken by each solve."""
+    solver.get_coin_counts(10, 0.64, engine="heuristic")
+    solver.get_coin_counts(10, 0.64)
+    solver.get_coin_counts(65_535, 2345.67, engine="heuristic")
+    solver.get_coin_counts(3, 0.30, denominations=solver.DENOMINATION_SETS["euro"])
+    stats = solver.get_stats()
+    assert stats["paths"] == {
+        "heuristic": 1,
+        "lattice": 1,
+        "heuristic+brute_force": 1,
+        "denominations": 1,
+    }
+    assert stats["counters"]["brute_force_fallbacks"] == 1
+    assert stats["counters"]["brute_force_candidates"] > 0
+    assert set(stats["phase_ns"]) == {"converge", "adjust", "brute_force"}
+    assert set(stats["engine_ns"]) == {"heuristic", "lattice"}
+    assert solver_stats.phase is None
+
+
+def test_stats_cache(solver_stats, solver_cache):
+    """Should count solves served by the cache."""
+    solver.get_coin_counts(6, 0.3)
+    solver.get_coin_counts(6, 0.3)
+    assert solver.get_stats()["paths"] == {"lattice": 1, "cache": 1}
+
+
+def test_stats_disabled():
+    """Should not report stats when they are disabled."""
+    solver.get_coin_counts(65_535, 2345.67)
+    assert solver.get_stats() is None
+
+
+def test_coin_counts():
+    """Should keep a running total of cents as coins are substituted."""
+    coin_counts = solver.CoinCounts(pennies=4, nickels=3, dimes=2, quarters=1)
+    assert (coin_counts.count, coin_counts.cents) == (10, 64)
+
+    coin_counts.substitute("nickels", "quarters", 2)
+    assert tuple(coin_counts) == (4, 1, 2, 3)
+    assert coin_counts.cents == 64 + 40
+
+    coin_counts.adjust({"quarters": 1, "dimes": -2, "nickels": +1}, -1)
+    assert tuple(coin_counts) == (4, 0, 4, 2)
+    assert coin_counts.cents == 64 + 40 - 10
+    assert coin_counts["dimes"] == 4
+
+
+def test_coin_counts_dict():
+    """Should convert to and from the JSON representation."""
+    counts_dict = {"pennies": 1, "nickels": 2, "dimes": 3, "quarters": 4}
+    coin_counts = solver.CoinCounts.from_dict(counts_dict)
+    assert coin_counts == solver.CoinCounts(1, 2, 3, 4)
+    assert coin_counts.as_dict() == counts_dict
+    assert coin_counts.as_dict() is not coin_counts.as_dict()
+
+
+def assert_denominations_feasibility(denominations, max_count):
+    """Should solve exactly the (count, cents) pairs that can be made."""
+    feasible = set()
+    for counts in itertools.product(range(max_count + 1), repeat=len(denominations)):
+        if sum(counts) <= max_count:
+            total_cents = sum(c * v for c, v in zip(counts, denominations.values()))
+            feasible.add((sum(counts), total_cents))
+    for count in range(max_count + 1):
+        for cents in range(max(denominations.values()) * count + 2):
+            counts = solver.get_coin_counts(
+                count, cents / 100, denominations=denominations
+            )
+            assert (counts is not None) == ((count, cents) in feasible)
+            if counts is not None:
+                assert list(counts) == list(denominations)
+                assert sum(counts.values()) == count
+                assert solver.get_current_amount(counts, denominations) == cents / 100
+                assert all(coin_count >= 0 for coin_count in counts.values())
+
+
+@pytest.mark.parametrize(
+    "denominations, max_count",
+    [
+        ({"pennies": 1, "nickels": 5, "dimes": 10, "quarters": 25, "x": 26}, 8),
+        ({"small": 3, "medium": 7, "large": 11}, 12),
+        ({"tokens": 50, "double-tokens": 2}, 20),
+        ({"tokens": 5}, 10),
+        (solver.DENOMINATION_SETS["us-half-dollars"], 7),
+    ],
+)
+def test_denominations(denominations, max_count):
+    """Should solve for arbitrary sets of denominations."""
+    assert_denominations_feasibility(denominations, max_count)
+
+
+def test_denominations_large():
+    """Should solve SPEC-scale inputs for other denominations."""
+    euro = solver.DENOMINATION_SETS["euro"]
+    counts = solver.get_coin_counts(65_535, 65_534.99, denominations=euro)
+    assert sum(counts.values()) == 65_535
+    assert solver.get_current_amount(counts, euro) == 65_534.99
+
+
+@pytest.mark.parametrize(
+    "denominations",
+    [
+        {"tokens": 1, "triple-tokens": 3, "bars": 1000},
+        {"a": 1, "b": 25, "c": 100, "d": 500},
+        dict(solver.DENOMINATION_SETS["euro"], notes=1000),
+    ],
+)
+def test_denominations_widely_spread(denominations):
+    """Should stop the change table well short of the square of the largest
+    value when denominations are widely spread."""
+    counts = solver.get_coin_counts(1_000, 2_500.0, denominations=denominations)
+    assert sum(counts.values()) == 1_000
+    assert solver.get_current_amount(counts, denominations) == 2_500.0
+    values = sorted(denominations.values())
+    coin_values = tuple(value - values[0] for value in values[1:])
+    min_coins, last_coins = solver.get_change_table(coin_values)
+    assert len(min_coins) <= 10 * coin_values[-1]
+
+
+@pytest.mark.parametrize(
+    "denominations_spec, expected",
+    [
+        ("us", solver.COIN_CENTS),
+        ("a=1, b=3", {"a": 1, "b": 3}),
+    ],
+)
+def test_parse_denominations(denominations_spec, expected):
+    """Should parse named sets and lists of type=cents pairs."""
+    assert solver.parse_denominations(denominations_spec) == expected
+
+
+@pytest.mark.parametrize("denominations_spec", ["a", "a=0", "a=1,b=1", "a=x"])
+def test_parse_denominations_invalid(denominations_spec):
+    """Should reject malformed or ambiguous denominations."""
+    with pytest.raises(ValueError):
+        solver.parse_denominations(denominations_spec)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import pytest
+
+import coinproblem.batch as batch
+import coinproblem.solver as solver
+import coinproblem.table as table
+from coinproblem.solver import AnswerTable, TableError
+
+MAX_COUNT = 40
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    """Should build a small answer table for each test."""
+    path = tmp_path / "answers.bin"
+    table.build_table(path, MAX_COUNT)
+    return path
+
+
+@pytest.fixture
+def loaded_table(table_path):
+    """Should load the answer table for the duration of a test."""
+    try:
+        yield solver.load_table(table_path)
+    finally:
+        solver.unload_table()
+
+
+def test_lookup(loaded_table):
+    """Should tabulate the lattice solution for every (count, cents) pair."""
+    for count in range(MAX_COUNT + 1):
+        for cents in range(count, 25 * count + 1):
+            assert loaded_table.lookup(count, cents) == solver.solve_with_lattice(
+                count, cents / 100
+            )
+
+
+@pytest.mark.parametrize("count, cents", [(MAX_COUNT + 1, 100), (3, 2), (3, 76)])
+def test_lookup_outside(loaded_table, count, cents):
+    """Should raise a KeyError for pairs outside the table."""
+    with pytest.raises(KeyError):
+        loaded_table.lookup(count, cents)
+
+
+def test_get_coin_counts(loaded_table):
+    """Should answer from the table, and compute anything outside of it."""
+    assert solver.get_coin_counts(3, 0.04) is None
+    assert solver.get_coin_counts(10, 0.5) == loaded_table.lookup(10, 50).as_dict()
+    coin_counts = solver.get_coin_counts(1692, 100.54)
+    assert sum(coin_counts.values()) == 1692
+
+
+def test_table_engine(loaded_table):
+    """Should dispatch to the table for problems inside it, and only then."""
+    assert solver.choose_engine(10, 0.5) == "table"
+    assert solver.choose_engine(MAX_COUNT + 1, 1.0) == "lattice"
+    assert solver.get_coin_counts(
+        MAX_COUNT + 1, 1.0, engine="table"
+    ) == solver.get_coin_counts(MAX_COUNT + 1, 1.0, engine="lattice")
+
+
+def test_build_without_numpy(table_path, tmp_path, monkeypatch):
+    """Should build an identical table without NumPy."""
+    monkeypatch.setattr(batch, "numpy", None)
+    python_path = tmp_path / "python-answers.bin"
+    table.build_table(python_path, MAX_COUNT)
+    assert python_path.read_bytes() == table_path.read_bytes()
+
+
+def test_stale_version(table_path):
+    """Should reject a table built for another format version."""
+    contents = bytearray(table_path.read_bytes())
+    contents[8] = AnswerTable.VERSION + 1
+    table_path.write_bytes(contents)
+    with pytest.raises(TableError, match="format version"):
+        AnswerTable(table_path)
+
+
+def test_corrupt_checksum(table_path):
+    """Should reject a table whose entries do not match its checksum."""
+    contents = bytearray(table_path.read_bytes())
+    contents[-1] ^= 0xFF
+    table_path.write_bytes(contents)
+    with pytest.raises(TableError, match="checksum"):
+        AnswerTable(table_path)
+
+
+def test_truncated(table_path):
+    """Should reject a table that is missing entries."""
+    table_path.write_bytes(table_path.read_bytes()[:-6])
+    with pytest.raises(TableError, match="truncated"):
+        AnswerTable(table_path)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+
+import pytest
+
+import coinproblem.verify as verify
+
+
+def get_input_count(min_count, max_count):
+    """Should count every amount of every count in the given range."""
+    return sum(24 * count + 1 for count in range(min_count, max_count + 1))
+
+
+def test_verify_shard():
+    """Should verify every amount of every count in a shard."""
+    results = verify.verify_shard(range(0, 12), "lattice", 1e9, slowest_count=3)
+    assert results["verified"] == get_input_count(0, 11)
+    assert results["failures"] == []
+    assert len(results["slowest"]) == 3
+
+
+@pytest.mark.parametrize(
+    "count, cents, coin_counts, reason",
+    [
+        (3, 7, {"pennies": 2, "nickels": 1, "dimes": 0, "quarters": 0}, None),
+        (3, 4, None, None),
+        (3, 7, None, "no solution returned"),
+        (3, 4, {"pennies": 4, "nickels": 0, "dimes": 0, "quarters": 0}, "unsolvable"),
+        (3, 7, {"pennies": 7, "nickels": 1, "dimes": -5, "quarters": 0}, "negative"),
+        (3, 7, {"pennies": 7, "nickels": 0, "dimes": 0, "quarters": 0}, "count"),
+        (3, 7, {"pennies": 1, "nickels": 1, "dimes": 1, "quarters": 0}, "amount"),
+    ],
+)
+def test_failure_reason(count, cents, coin_counts, reason):
+    """Should explain exactly what is wrong with a wrong answer."""
+    actual_reason = verify.get_failure_reason(count, cents, coin_counts)
+    if reason is None:
+        assert actual_reason is None
+    else:
+        assert reason in actual_reason
+
+
+@pytest.mark.parametrize("solvable", [False, True])
+def test_failure_reason_independent(solvable, monkeypatch):
+    """Should not rely on the lattice to decide whether an input is solvable."""
+    monkeypatch.setattr(verify.solver, "is_solvable", lambda *_: solvable)
+    assert verify.get_failure_reason(3, 4, None) is None
+    assert verify.get_failure_reason(3, 7, None) == "no solution returned"
+
+
+def test_over_budget():
+    """Should report inputs that take longer than the time budget."""
+    results = verify.verify_shard(range(2, 3), "lattice", 0, slowest_count=1)
+    assert len(results["failures"]) == results["verified"] == 49
+    assert "over budget" in results["failures"][0][2]
+
+
+def test_resume(tmp_path, capsys):
+    """Should skip shards that a checkpoint has already completed."""
+    checkpoint_path = tmp_path / "checkpoint.json"
+    options = dict(
+        max_count=30,
+        engine="lattice",
+        workers=2,
+        shard_size=8,
+        budget_ms=1e6,
+        checkpoint_path=checkpoint_path,
+    )
+    checkpoint = verify.run_verification(**options)
+    assert sorted(checkpoint["completed_shards"]) == [0, 1, 2, 3]
+    assert checkpoint["verified"] == get_input_count(0, 30)
+    assert checkpoint["failures"] == []
+
+    # Forget the last shard, as if the sweep had been interrupted before it
+    saved = json.loads(checkpoint_path.read_text())
+    saved["completed_shards"].remove(3)
+    saved["verified"] -= get_input_count(24, 30)
+    checkpoint_path.write_text(json.dumps(saved))
+    capsys.readouterr()
+    checkpoint = verify.run_verification(**options)
+    output = capsys.readouterr().out
+    assert "shard 3 done" in output
+    assert "shard 0 done" not in output
+    assert checkpoint["verified"] == get_input_count(0, 30)
+
+    with pytest.raises(ValueError, match="different parameters"):
+        verify.run_verification(**dict(options, max_count=40))